@@ -0,0 +1,215 @@
+"""
+Локальная замена Telegram Bot API для нагрузочных тестов.
+
+Бот направляется на сервер через TELEGRAM_BASE_URL=<url>/bot. Сервер отдает
+боту апдейты через getUpdates (long polling), принимает sendMessage,
+editMessageText и т.п. и складывает ответы бота по чатам, откуда их
+забирают симулированные пользователи (bench.load_test).
+"""
+import itertools
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'CareerPilot', 'username': 'career_pilot_bot'}
+
+# Методы, ответ которых пользователь видит в чате
+REPLY_METHODS = ('sendMessage', 'editMessageText', 'editMessageReplyMarkup')
+
+
+class FakeBotApi:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        """
+        :param port: Порт; 0 — выбрать свободный.
+        """
+        self.updates: List[Dict] = []
+        self.update_ids = itertools.count(1)
+        self.updates_ready = threading.Condition()
+        self.polling = threading.Event()
+
+        self.lock = threading.Lock()
+        self.message_ids: Dict[int, itertools.count] = {}
+        self.messages: Dict[Tuple[int, int], Dict] = {}
+        self.replies: Dict[int, queue.Queue] = {}
+        self.calls: Dict[str, int] = {}
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                api.handle(self)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def __repr__(self):
+        return f"<FakeBotApi(url={self.url}, pending_updates={len(self.updates)})>"
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # --- Сторона пользователя ---
+
+    def next_message_id(self, chat_id: int) -> int:
+        with self.lock:
+            if chat_id not in self.message_ids:
+                self.message_ids[chat_id] = itertools.count(1)
+                self.replies[chat_id] = queue.Queue()
+            return next(self.message_ids[chat_id])
+
+    @staticmethod
+    def user(chat_id: int) -> Dict:
+        return {'id': chat_id, 'is_bot': False, 'first_name': f'User {chat_id}'}
+
+    def push(self, update: Dict) -> None:
+        with self.updates_ready:
+            update['update_id'] = next(self.update_ids)
+            self.updates.append(update)
+            self.updates_ready.notify_all()
+
+    def send_text(self, chat_id: int, text: str) -> None:
+        """Пользователь пишет боту; /команда помечается entity bot_command."""
+        message = {
+            'message_id': self.next_message_id(chat_id),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private', 'first_name': f'User {chat_id}'},
+            'from': self.user(chat_id),
+            'text': text,
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        self.push({'message': message})
+
+    def press(self, chat_id: int, message: Dict, data: str) -> None:
+        """Пользователь нажимает inline-кнопку с callback_data=data под сообщением бота."""
+        self.push({
+            'callback_query': {
+                'id': f'{chat_id}-{time.monotonic_ns()}',
+                'from': self.user(chat_id),
+                'chat_instance': str(chat_id),
+                'message': message,
+                'data': data,
+            }
+        })
+
+    def wait_reply(self, chat_id: int, timeout: float) -> Optional[Dict]:
+        """Следующее видимое пользователю сообщение бота в чате (или None по таймауту)."""
+        self.next_message_id(chat_id)
+        try:
+            return self.replies[chat_id].get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    # --- Сторона бота ---
+
+    def get_updates(self, params: Dict) -> List[Dict]:
+        self.polling.set()
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or 100)
+        deadline = time.monotonic() + float(params.get('timeout') or 0)
+        with self.updates_ready:
+            # Подтвержденные апдейты (update_id < offset) больше не нужны
+            self.updates = [update for update in self.updates if update['update_id'] >= offset]
+            while not self.updates:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.updates_ready.wait(remaining)
+            return self.updates[:limit]
+
+    def bot_message(self, params: Dict) -> Dict:
+        chat_id = int(params['chat_id'])
+        message = {
+            'message_id': self.next_message_id(chat_id),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private', 'first_name': f'User {chat_id}'},
+            'from': BOT_USER,
+            'text': params.get('text', ''),
+        }
+        if params.get('reply_markup'):
+            message['reply_markup'] = params['reply_markup']
+        with self.lock:
+            self.messages[(chat_id, message['message_id'])] = message
+        return message
+
+    def edit_message(self, params: Dict) -> Dict:
+        chat_id, message_id = int(params['chat_id']), int(params['message_id'])
+        with self.lock:
+            message = dict(self.messages.get((chat_id, message_id)) or {
+                'message_id': message_id, 'date': int(time.time()), 'from': BOT_USER,
+                'chat': {'id': chat_id, 'type': 'private', 'first_name': f'User {chat_id}'},
+            })
+            if 'text' in params:
+                message['text'] = params['text']
+            if params.get('reply_markup'):
+                message['reply_markup'] = params['reply_markup']
+            else:
+                message.pop('reply_markup', None)
+            message['edit_date'] = int(time.time())
+            self.messages[(chat_id, message_id)] = message
+        return message
+
+    def call(self, method: str, params: Dict):
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if method == 'getMe':
+            return BOT_USER
+        if method == 'getUpdates':
+            return self.get_updates(params)
+        if method == 'sendMessage':
+            message = self.bot_message(params)
+        elif method in ('editMessageText', 'editMessageReplyMarkup'):
+            message = self.edit_message(params)
+        else:
+            return True
+        self.replies[message['chat']['id']].put(message)
+        return message
+
+    @staticmethod
+    def read_params(request: BaseHTTPRequestHandler) -> Dict:
+        """Параметры запроса PTB: форма с JSON-значениями либо JSON-тело."""
+        body = request.rfile.read(int(request.headers.get('Content-Length') or 0)).decode()
+        if request.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(body or '{}')
+        params = {}
+        for key, value in parse_qsl(body):
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+        return params
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        method = urlsplit(request.path).path.rsplit('/', 1)[-1]
+        result = self.call(method, self.read_params(request))
+        data = json.dumps({'ok': True, 'result': result}, ensure_ascii=False).encode()
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def start(self) -> 'FakeBotApi':
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-bot-api', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self.updates_ready:
+            self.updates_ready.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,193 @@
+"""
+Локальная замена DevKG и hh.ru для нагрузочных тестов без интернета.
+
+    python -m bench.fake_sources [--port 8800] [--latency 0.05] [--jitter 0.02]
+                                 [--error-rate 0.1] [--rate-limit 20]
+
+Отдает страницы из bench/fixtures:
+    /ru/jobs?page=N   — страница DevKG (ссылки вакансий свои на каждой странице);
+    /vacancies?page=N — ответ API hh.ru.
+Ответы помечены ETag и поддерживают If-None-Match, как настоящие источники.
+
+Задержка, доля ошибок 503 и лимит запросов в секунду (сверх него — 429 с Retry-After)
+задаются аргументами и меняются на лету через атрибуты FakeSources.
+Чтобы направить на сервер бота или бенчмарки:
+    DEV_KG_URL=http://127.0.0.1:8800/ru/jobs?page= HEAD_HUNTER_URL=http://127.0.0.1:8800/vacancies
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class FakeSources:
+    """
+    HTTP-сервер с поддельными источниками вакансий в фоновом потоке.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: float = 0.0, seed: int = 0):
+        """
+        :param port: Порт; 0 — выбрать свободный.
+        :param latency: Задержка перед каждым ответом, секунды.
+        :param jitter: Случайная добавка к задержке, от 0 до jitter секунд.
+        :param error_rate: Доля запросов, на которые отвечать 503.
+        :param rate_limit: Запросов в секунду, сверх которых отвечать 429 (0 — без лимита).
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = (0, 0)
+        self.stats = {'requests': 0, 'not_modified': 0, 'errors': 0, 'rate_limited': 0}
+
+        with open(os.path.join(FIXTURES, 'devkg_page.html'), encoding='utf-8') as file:
+            self.devkg_page = file.read()
+        with open(os.path.join(FIXTURES, 'hh_page.json'), encoding='utf-8') as file:
+            self.hh_page = json.load(file)
+
+        sources = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                sources.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def __repr__(self):
+        return f"<FakeSources(url={self.url}, latency={self.latency}, error_rate={self.error_rate})>"
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Переменные окружения, направляющие парсеры на этот сервер."""
+        return {'DEV_KG_URL': f"{self.url}/ru/jobs?page=", 'HEAD_HUNTER_URL': f"{self.url}/vacancies"}
+
+    def devkg(self, query: Dict) -> str:
+        page = int(query.get('page', ['1'])[0])
+        return re.sub(r'/jobs/(\d+)', lambda match: f'/jobs/{page}{match.group(1)}', self.devkg_page)
+
+    def hh(self, query: Dict) -> str:
+        page = int(query.get('page', ['0'])[0])
+        body = dict(self.hh_page, page=page)
+        if page >= body['pages']:
+            body['items'] = []
+        else:
+            body['items'] = [
+                dict(item, id=f"{page}{item['id']}", alternate_url=f"{item['alternate_url']}{page}")
+                for item in body['items']
+            ]
+        return json.dumps(body, ensure_ascii=False)
+
+    def admit(self) -> Tuple[bool, bool]:
+        """Решает судьбу запроса: (превышен лимит, инжектировать ошибку)."""
+        with self.lock:
+            self.stats['requests'] += 1
+            limited = False
+            if self.rate_limit:
+                second = int(time.monotonic())
+                started, count = self.window
+                if started != second:
+                    started, count = second, 0
+                count += 1
+                self.window = (started, count)
+                limited = count > self.rate_limit
+            failed = not limited and self.random.random() < self.error_rate
+            delay = self.latency + (self.random.random() * self.jitter if self.jitter else 0)
+            if limited:
+                self.stats['rate_limited'] += 1
+            elif failed:
+                self.stats['errors'] += 1
+        if delay:
+            time.sleep(delay)
+        return limited, failed
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        limited, failed = self.admit()
+        if limited:
+            request.send_response(429)
+            request.send_header('Retry-After', '1')
+            request.end_headers()
+            return
+        if failed:
+            request.send_error(503)
+            return
+
+        parts = urlsplit(request.path)
+        query = parse_qs(parts.query)
+        if parts.path == '/ru/jobs':
+            body, content_type = self.devkg(query), 'text/html; charset=utf-8'
+        elif parts.path == '/vacancies':
+            body, content_type = self.hh(query), 'application/json; charset=utf-8'
+        else:
+            request.send_error(404)
+            return
+
+        data = body.encode()
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            with self.lock:
+                self.stats['not_modified'] += 1
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+
+        request.send_response(200)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(data)))
+        request.send_header('ETag', etag)
+        request.end_headers()
+        request.wfile.write(data)
+
+    def start(self) -> 'FakeSources':
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-sources', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0)
+    args = parser.parse_args()
+
+    sources = FakeSources(args.host, args.port, args.latency, args.jitter, args.error_rate, args.rate_limit).start()
+    for name, value in sources.env().items():
+        print(f"{name}={value}")
+    try:
+        sources.thread.join()
+    except KeyboardInterrupt:
+        sources.stop()
+        print(json.dumps(sources.stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Нагрузочный тест бота: N симулированных пользователей через поддельный Bot API.
+
+    python -m bench.load_test [--users 10 50 100] [--iterations 3] [--slo 1.0]
+                              [--output results.json]
+
+Бот (run.py) запускается отдельным процессом с TELEGRAM_BASE_URL, указывающим
+на bench.fake_bot_api, и источниками вакансий из bench.fake_sources. Каждый
+пользователь в своем чате iterations раз проходит сценарии:
+    add_task         — добавление задачи через календарь и ввод времени;
+    browse_tasks     — список задач за все время и карточка задачи;
+    search_vacancies — поиск вакансий;
+    vacancy_detail   — карточка найденной вакансии.
+
+Для каждого сценария считаются p50/p95/p99 задержки ответа бота на одно
+действие пользователя, длительность сценария и пропускная способность.
+Емкость — наибольшее число пользователей, при котором p95 ответа во всех
+сценариях укладывается в --slo.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from bench.fake_bot_api import FakeBotApi
+from bench.fake_sources import FakeSources
+
+FLOWS = ('add_task', 'browse_tasks', 'search_vacancies', 'vacancy_detail')
+QUERIES = ('python', 'java', 'frontend', 'qa', 'devops', 'android', 'ios', 'golang', 'php', 'data')
+
+
+class FlowError(Exception):
+    pass
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    values = sorted(values)
+
+    def percentile(p):
+        return values[min(len(values) - 1, int(p * len(values)))]
+
+    return {'p50': percentile(0.5), 'p95': percentile(0.95), 'p99': percentile(0.99)}
+
+
+def buttons(message: Dict, predicate: Callable[[str], bool]) -> List[str]:
+    """callback_data inline-кнопок сообщения, подходящих под predicate."""
+    keyboard = (message.get('reply_markup') or {}).get('inline_keyboard') or []
+    return [button['callback_data'] for row in keyboard for button in row
+            if button.get('callback_data') and predicate(button['callback_data'])]
+
+
+class SimulatedUser:
+    """Пользователь в отдельном чате, проходящий сценарии по очереди."""
+
+    def __init__(self, api: FakeBotApi, chat_id: int, timeout: float):
+        self.api = api
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.steps: List[float] = []
+        self.search_result: Optional[Dict] = None
+
+    def reply(self, started: float) -> Dict:
+        message = self.api.wait_reply(self.chat_id, self.timeout)
+        if message is None:
+            raise FlowError(f"чат {self.chat_id}: нет ответа за {self.timeout} с")
+        self.steps.append(time.perf_counter() - started)
+        return message
+
+    def say(self, text: str) -> Dict:
+        started = time.perf_counter()
+        self.api.send_text(self.chat_id, text)
+        return self.reply(started)
+
+    def press(self, message: Dict, data: str) -> Dict:
+        started = time.perf_counter()
+        self.api.press(self.chat_id, message, data)
+        return self.reply(started)
+
+    def press_first(self, message: Dict, prefix: str, last: bool = False) -> Dict:
+        found = buttons(message, lambda data: data.startswith(prefix))
+        if not found:
+            raise FlowError(f"чат {self.chat_id}: нет кнопки {prefix}* в «{message.get('text')}»")
+        return self.press(message, found[-1] if last else found[0])
+
+    def add_task(self, number: int) -> None:
+        self.say('Добавить задачу')
+        self.say(f'Нагрузочный тест {number}')
+        calendar = self.say('/skip')
+        # Год берем последний из предложенных, чтобы напоминание не сработало во время теста
+        calendar = self.press_first(calendar, 'cbcal_0_s_y_', last=True)
+        calendar = self.press_first(calendar, 'cbcal_0_s_m_')
+        self.press_first(calendar, 'cbcal_0_s_d_')
+        done = self.say('12:30')
+        if 'сохранена' not in done.get('text', ''):
+            raise FlowError(f"чат {self.chat_id}: задача не сохранена: «{done.get('text')}»")
+
+    def browse_tasks(self, number: int) -> None:
+        periods = self.say('Посмотреть список задач')
+        tasks = self.press(periods, 'all_time')
+        self.press_first(tasks, 'task_')
+
+    def search_vacancies(self, number: int) -> None:
+        self.say('Поиск вакансий')
+        self.search_result = self.say(QUERIES[(self.chat_id + number) % len(QUERIES)])
+
+    def vacancy_detail(self, number: int) -> None:
+        if self.search_result is None:
+            raise FlowError(f"чат {self.chat_id}: нет результатов поиска")
+        self.press_first(self.search_result, 'vacancy_')
+
+
+def run_user(api: FakeBotApi, chat_id: int, iterations: int, timeout: float) -> Dict[str, Dict]:
+    user = SimulatedUser(api, chat_id, timeout)
+    results = {flow: {'steps': [], 'durations': [], 'errors': 0} for flow in FLOWS}
+    for number in range(iterations):
+        for flow in FLOWS:
+            user.steps = []
+            started = time.perf_counter()
+            try:
+                getattr(user, flow)(number)
+            except FlowError as e:
+                results[flow]['errors'] += 1
+                results[flow]['last_error'] = str(e)
+                # Ответ мог прийти позже таймаута — не даем ему сбить следующий сценарий
+                while api.wait_reply(chat_id, 0.5) is not None:
+                    pass
+                continue
+            results[flow]['durations'].append(time.perf_counter() - started)
+            results[flow]['steps'].extend(user.steps)
+    return results
+
+
+def run_level(api: FakeBotApi, users: int, first_chat: int, iterations: int, timeout: float) -> Dict:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        per_user = list(executor.map(
+            lambda chat_id: run_user(api, chat_id, iterations, timeout),
+            range(first_chat, first_chat + users),
+        ))
+    seconds = time.perf_counter() - started
+
+    report = {'users': users, 'seconds': seconds, 'flows': {}}
+    total_steps = 0
+    for flow in FLOWS:
+        steps = [value for result in per_user for value in result[flow]['steps']]
+        durations = [value for result in per_user for value in result[flow]['durations']]
+        errors = sum(result[flow]['errors'] for result in per_user)
+        total_steps += len(steps)
+        report['flows'][flow] = {
+            'completed': len(durations),
+            'errors': errors,
+            'step_latency': percentiles(steps),
+            'flow_duration': percentiles(durations),
+            'flows_per_second': len(durations) / seconds,
+        }
+        last_errors = [result[flow]['last_error'] for result in per_user if 'last_error' in result[flow]]
+        if last_errors:
+            report['flows'][flow]['last_error'] = last_errors[-1]
+    report['updates_per_second'] = total_steps / seconds
+    return report
+
+
+def start_bot(api: FakeBotApi, sources: FakeSources, directory: str, env: Dict[str, str]) -> subprocess.Popen:
+    bot_env = dict(
+        os.environ, **sources.env(), **env,
+        BOT_TOKEN='123456:load-test',
+        TELEGRAM_BASE_URL=f"{api.url}/bot",
+        TELEGRAM_BASE_FILE_URL=f"{api.url}/file/bot",
+        WEBHOOK_URL='',
+        DB_NAME=os.path.join(directory, 'bot.db'),
+        HTTP_CACHE_DB=os.path.join(directory, 'http_cache.db'),
+        METRICS_PORT='0',
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen(
+        [sys.executable, 'run.py'], cwd=root, env=bot_env,
+        stdout=subprocess.DEVNULL, stderr=open(os.path.join(directory, 'bot.log'), 'w'),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=10, help='Сколько ждать ответа бота, секунды')
+    parser.add_argument('--slo', type=float, default=1.0, help='Порог p95 ответа для расчета емкости, секунды')
+    parser.add_argument('--warmup', type=float, default=3, help='Пауза на первый обход источников, секунды')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='Переменные окружения бота, например UPDATE_CONCURRENCY=8')
+    parser.add_argument('--output', help='Куда записать JSON с результатами (по умолчанию stdout)')
+    args = parser.parse_args()
+
+    api = FakeBotApi().start()
+    sources = FakeSources().start()
+    results = {'levels': [], 'env': dict(item.split('=', 1) for item in args.env)}
+    with tempfile.TemporaryDirectory() as directory:
+        bot = start_bot(api, sources, directory, results['env'])
+        try:
+            if not api.polling.wait(30):
+                with open(os.path.join(directory, 'bot.log')) as log:
+                    print(log.read(), file=sys.stderr)
+                raise SystemExit('Бот не начал опрашивать getUpdates')
+            time.sleep(args.warmup)
+
+            first_chat = 1000
+            for users in args.users:
+                level = run_level(api, users, first_chat, args.iterations, args.timeout)
+                first_chat += users
+                results['levels'].append(level)
+                for flow, report in level['flows'].items():
+                    latency = report['step_latency']
+                    print(
+                        f"{users:>5} users {flow:17} p50 {latency['p50'] or 0:7.3f}  p95 {latency['p95'] or 0:7.3f}  "
+                        f"p99 {latency['p99'] or 0:7.3f} s  {report['flows_per_second']:7.1f} flows/s  "
+                        f"errors {report['errors']}",
+                        file=sys.stderr,
+                    )
+        finally:
+            bot.send_signal(signal.SIGINT)
+            try:
+                bot.wait(15)
+            except subprocess.TimeoutExpired:
+                bot.kill()
+            api.stop()
+            sources.stop()
+
+    within_slo = [
+        level['users'] for level in results['levels']
+        if all(report['errors'] == 0 and (report['step_latency']['p95'] or 0) <= args.slo
+               for report in level['flows'].values())
+    ]
+    results['capacity_users'] = max(within_slo, default=0)
+    results['bot_api_calls'] = api.calls
+    print(f"Емкость при p95 ≤ {args.slo} с: {results['capacity_users']} пользователей", file=sys.stderr)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Проверяет по EXPLAIN QUERY PLAN, что диапазонные запросы TaskManager идут по индексу.
+
+    python -m bench.query_plan
+
+Проверка выполняется в отдельном процессе на временной базе (как в
+bench.write_throughput), рабочая база DB_NAME не затрагивается.
+"""
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+
+INDEX_SCAN = 'USING INDEX tasks_chat_date (chat_id=? AND date>? AND date<?)'
+
+
+def traced_select(task, call) -> str:
+    """Выполняет call() и возвращает последний SELECT, отправленный в Sqlite."""
+    statements = []
+    connection = task.db.read_connection()
+    connection.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        connection.set_trace_callback(None)
+    return [statement for statement in statements if statement.lstrip().upper().startswith('SELECT')][-1]
+
+
+def worker() -> int:
+    from core.database import SqliteDB
+    from task.manager import TaskManager
+
+    task = TaskManager(SqliteDB())
+    start = datetime.date.today()
+    end = start + datetime.timedelta(days=7)
+    first = task.create(1, 'query plan', '', start, 'В процессе')
+
+    calls = {
+        'get_tasks_for_range': lambda: task.get_tasks_for_range(1, start, end),
+        'page': lambda: task.page(1, start, end, limit=10),
+        'page (after)': lambda: task.page(1, start, end, after=(first['date'], first['id']), limit=10),
+    }
+
+    failed = False
+    for name, call in calls.items():
+        query = traced_select(task, call)
+        plan = " | ".join(row[3] for row in task.connection.execute(f"EXPLAIN QUERY PLAN {query}"))
+        ok = INDEX_SCAN in plan and 'TEMP B-TREE' not in plan
+        failed |= not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {name}: {plan}")
+    task.db.close()
+    return 1 if failed else 0
+
+
+def main() -> int:
+    if '--worker' in sys.argv[1:]:
+        return worker()
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DB_NAME=os.path.join(directory, 'query_plan.db'), METRICS_PORT='0')
+        return subprocess.run([sys.executable, '-m', 'bench.query_plan', '--worker'], env=env).returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
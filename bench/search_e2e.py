@@ -0,0 +1,146 @@
+"""
+Сквозной бенчмарк поиска вакансий против локальных источников (bench.fake_sources).
+
+    python -m bench.search_e2e [--concurrency 20] [--output results.json]
+
+Для каждого сценария (задержка, ошибки, лимит запросов, таймаут источника)
+поднимается FakeSources, а замеры выполняются в отдельном процессе с чистыми
+HTTP-кэшем и базой:
+    cold        — SourceFanOut.search с пустым HTTP-кэшем;
+    warm        — тот же запрос повторно (ответы из кэша);
+    concurrent  — concurrency разных запросов одновременно с пустым кэшем;
+    crawl       — VacancyCrawler.crawl в пустую базу и поиск по ней JobManager.search.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from bench.fake_sources import FakeSources
+
+SCENARIOS = {
+    'baseline': ({}, {}),
+    'latency 100ms ± 50ms': ({'latency': 0.1, 'jitter': 0.05}, {}),
+    'errors 20%': ({'error_rate': 0.2}, {}),
+    'rate limit 30 rps': ({'rate_limit': 30}, {}),
+    'source slower than timeout': ({'latency': 1.5}, {'SOURCE_TIMEOUT': '1', 'CRAWL_SOURCE_TIMEOUT': '1'}),
+}
+QUERIES = ('python', 'java', 'frontend', 'qa', 'devops', 'android', 'ios', 'data', 'golang', 'php')
+
+
+def percentiles(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        'p50': timings[len(timings) // 2],
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'max': timings[-1],
+    }
+
+
+async def run_worker(concurrency: int) -> Dict:
+    from core.database import AsyncManager, SqliteDB
+    from job.crawler import VacancyCrawler
+    from job.manager import JobManager
+    from job.parser import get_parsers
+    from job.parser.cache import http_cache
+    from job.parser.fanout import SourceFanOut
+
+    fanout = SourceFanOut(get_parsers())
+    results = {}
+
+    async def timed_search(query: str):
+        started = time.perf_counter()
+        vacancies = await fanout.search(query)
+        return time.perf_counter() - started, len(vacancies)
+
+    for name in ('cold', 'warm'):
+        seconds, found = await timed_search('python')
+        results[name] = {'seconds': seconds, 'vacancies': found}
+
+    http_cache.clear()
+    queries = [QUERIES[number % len(QUERIES)] + str(number) for number in range(concurrency)]
+    started = time.perf_counter()
+    searches = await asyncio.gather(*(timed_search(query) for query in queries))
+    results['concurrent'] = {
+        'searches': concurrency,
+        'seconds': time.perf_counter() - started,
+        'latency': percentiles([seconds for seconds, _ in searches]),
+        'vacancies': sum(found for _, found in searches),
+    }
+
+    http_cache.clear()
+    job = AsyncManager(JobManager(SqliteDB()))
+    started = time.perf_counter()
+    created = await VacancyCrawler(job).crawl()
+    crawl_seconds = time.perf_counter() - started
+    timings = []
+    for query in QUERIES:
+        started = time.perf_counter()
+        await job.search(query, 10, 0)
+        timings.append(time.perf_counter() - started)
+    results['crawl'] = {'seconds': crawl_seconds, 'created': created, 'db_search_latency': percentiles(timings)}
+    results['breakers'] = {name: repr(breaker) for name, breaker in fanout.breakers.items()}
+    return results
+
+
+def run_scenario(server: Dict, env: Dict, concurrency: int) -> Dict:
+    sources = FakeSources(**server).start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            worker_env = dict(
+                os.environ, **sources.env(), **env,
+                DB_NAME=os.path.join(directory, 'bench.db'),
+                HTTP_CACHE_DB=os.path.join(directory, 'http_cache.db'),
+                METRICS_PORT='0',
+            )
+            completed = subprocess.run(
+                [sys.executable, '-m', 'bench.search_e2e', '--worker', '--concurrency', str(concurrency)],
+                env=worker_env, capture_output=True, text=True,
+            )
+        if completed.returncode:
+            raise RuntimeError(completed.stderr)
+        results = json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        sources.stop()
+    results['server'] = sources.stats
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='Запустить только указанные сценарии')
+    parser.add_argument('--output', help='Куда записать JSON с результатами (по умолчанию stdout)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run_worker(args.concurrency))))
+        return
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        server, env = SCENARIOS[name]
+        results[name] = result = run_scenario(server, env, args.concurrency)
+        print(
+            f"{name:28} cold {result['cold']['seconds']:6.2f} s  warm {result['warm']['seconds']:6.3f} s  "
+            f"concurrent p95 {result['concurrent']['latency']['p95']:6.2f} s  crawl {result['crawl']['seconds']:6.2f} s",
+            file=sys.stderr,
+        )
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""
+Офлайн-бенчмарки горячих путей менеджеров и парсеров.
+
+    python -m bench.suite [--rows 10000 100000 1000000] [--output results.json]
+                          [--baseline previous.json --tolerance 0.2]
+
+Для каждого размера таблицы tasks и jobs заполняются синтетическими строками
+во временной базе (отдельный процесс, как в bench.write_throughput) и замеряются
+методы TaskManager и JobManager. Парсеры DevKG и HhParser разбирают сохраненные
+страницы из bench/fixtures без обращения к сети.
+
+Результаты пишутся в JSON. С --baseline сравниваются средние времена, и при
+замедлении больше чем на tolerance команда завершается с кодом 1.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+CHATS = 1000
+JOB_TYPES = ('Полный день', 'Удаленная работа', 'Гибкий график', 'Частичная занятость')
+STATUSES = ('В процессе', 'Выполнен', 'Не Выполнен')
+
+
+def measure(call: Callable, repeat: int, items: int = 1) -> Dict[str, float]:
+    """
+    Вызывает call() repeat раз.
+    :param items: Сколько элементов обрабатывает один вызов (для items_per_second).
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    mean = statistics.fmean(timings)
+    return {
+        'repeat': repeat,
+        'mean': mean,
+        'p50': timings[len(timings) // 2],
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'items_per_second': items / mean if mean else 0.0,
+    }
+
+
+def seed(connection: sqlite3.Connection, rows: int) -> None:
+    """Заполняет tasks и jobs синтетическими строками одной транзакцией."""
+    from job.manager import content_hash, vacancy_key
+    from task.manager import to_db_datetime
+
+    rng = random.Random(rows)
+    start = datetime.datetime(2024, 1, 1)
+    connection.executemany(
+        "INSERT INTO tasks (chat_id, title, description, date, status) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                number % CHATS,
+                f'Задача {number}',
+                'Описание задачи для бенчмарка',
+                to_db_datetime(start + datetime.timedelta(minutes=rng.randrange(365 * 24 * 60))),
+                rng.choice(STATUSES),
+            )
+            for number in range(rows)
+        ),
+    )
+
+    def jobs():
+        for number in range(rows):
+            job = {
+                'title': f'Developer {number}',
+                'company': f'Company {number % 5000}',
+                'link': f'https://example.com/jobs/{number}',
+                'salary': f'{rng.randrange(30, 300)} 000 KGS',
+                'job_type': rng.choice(JOB_TYPES),
+                'status': 'Новая',
+            }
+            yield (*job.values(), content_hash(job), vacancy_key(job))
+
+    connection.executemany(
+        """
+        INSERT INTO jobs (title, company, link, salary, job_type, status, content_hash, vacancy_key)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        jobs(),
+    )
+    connection.commit()
+    connection.execute("ANALYZE")
+
+
+def bench_managers(rows: int, repeat: int) -> Dict[str, Dict]:
+    from core.database import SqliteDB
+    from job.manager import JobManager
+    from task.manager import TaskManager
+
+    database = SqliteDB()
+    started = time.perf_counter()
+    seed(database.connection, rows)
+    seconds = time.perf_counter() - started
+
+    task = TaskManager(database)
+    job = JobManager(database)
+    rng = random.Random(0)
+    week_start = datetime.date(2024, 6, 3)
+    week_end = week_start + datetime.timedelta(days=7)
+
+    def random_task():
+        """Случайная задача и ее чат: seed кладет строку id в чат (id - 1) % CHATS."""
+        id = rng.randrange(1, rows + 1)
+        return (id - 1) % CHATS, id
+
+    def task_get():
+        chat_id, id = random_task()
+        assert task.get(chat_id, id=id) is not None
+
+    def task_update():
+        chat_id, id = random_task()
+        task.update(chat_id, id, status=rng.choice(STATUSES))
+
+    def job_get_or_create():
+        number = rng.randrange(rows * 2)
+        job.get_or_create(
+            title=f'Developer {number}', company=f'Company {number % 5000}', link=f'https://example.com/jobs/{number}',
+            salary='100 000 KGS', job_type=JOB_TYPES[0], status='Новая',
+        )
+
+    # all() по всей таблице jobs на больших размерах выполняется секундами — повторяем реже
+    heavy_repeat = max(1, repeat // 20)
+    results = {
+        'seed': {'rows': rows, 'seconds': seconds},
+        'TaskManager.get_tasks_for_range': measure(
+            lambda: task.get_tasks_for_range(rng.randrange(CHATS), week_start, week_end), repeat,
+        ),
+        'TaskManager.all': measure(lambda: task.all(rng.randrange(CHATS)), repeat),
+        'TaskManager.get': measure(task_get, repeat),
+        'TaskManager.update': measure(task_update, repeat),
+        'JobManager.get_or_create': measure(job_get_or_create, repeat),
+        'JobManager.all': measure(job.all, heavy_repeat, rows),
+        'JobManager.filter': measure(lambda: job.filter(job_type=rng.choice(JOB_TYPES)), heavy_repeat),
+    }
+    results['record_cache'] = {'task': task.cache.stats(), 'job': job.cache.stats()}
+    database.close()
+    return results
+
+
+class FixtureCache:
+    """Подменяет HttpCache: на любой запрос отдает сохраненную страницу."""
+
+    def __init__(self, name: str):
+        with open(os.path.join(FIXTURES, name), encoding='utf-8') as file:
+            self.text = file.read()
+
+    def get(self, url: str, params: dict = None, ttl: float = None, timeout: float = None,
+            validate=None) -> str:
+        return self.text
+
+
+def bench_parsers(repeat: int) -> Dict[str, Dict]:
+    from job.constants import DEV_KG_PAGES
+    from job.parser.dev import DevKG
+    from job.parser.hh import HhParser
+
+    dev_cache = FixtureCache('devkg_page.html')
+    dev = DevKG(cache=dev_cache)
+    dev_items = len(dev.search_vacancies(''))
+
+    hh_cache = FixtureCache('hh_page.json')
+    hh = HhParser(cache=hh_cache)
+    hh_items = len(hh.search_vacancies(''))
+
+    results = {
+        'DevKG.search_vacancies': measure(lambda: dev.search_vacancies('developer'), repeat, dev_items),
+        'HhParser.search_vacancies': measure(lambda: hh.search_vacancies('developer'), repeat, hh_items),
+    }
+    results['DevKG.search_vacancies']['bytes_per_call'] = len(dev_cache.text.encode()) * DEV_KG_PAGES
+    results['HhParser.search_vacancies']['bytes_per_call'] = len(hh_cache.text.encode()) * (hh_items // 100)
+    return results
+
+
+def worker(args) -> None:
+    if args.parsers:
+        results = bench_parsers(args.repeat)
+    else:
+        results = bench_managers(args.rows[0], args.repeat)
+    print(json.dumps(results))
+
+
+def run_worker(extra: List[str], repeat: int, env: dict) -> Dict:
+    output = subprocess.run(
+        [sys.executable, '-m', 'bench.suite', '--worker', '--repeat', str(repeat), *extra],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def flatten(results: Dict) -> Dict[str, Dict]:
+    """{'managers/10000/TaskManager.get': {...}, 'parsers/DevKG.search_vacancies': {...}}"""
+    flat = {}
+    for rows, benches in results.get('managers', {}).items():
+        for name, value in benches.items():
+            flat[f'managers/{rows}/{name}'] = value
+    for name, value in results.get('parsers', {}).items():
+        flat[f'parsers/{name}'] = value
+    return flat
+
+
+def regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Список замеров, у которых mean вырос больше чем в (1 + tolerance) раз."""
+    previous = flatten(baseline)
+    found = []
+    for name, current in flatten(results).items():
+        before = previous.get(name) or {}
+        if 'mean' in current and 'mean' in before and current['mean'] > before['mean'] * (1 + tolerance):
+            found.append(f"{name}: {before['mean']:.6f} -> {current['mean']:.6f} с")
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--output', help='Куда записать JSON с результатами (по умолчанию stdout)')
+    parser.add_argument('--baseline', help='JSON прошлого прогона для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--parsers', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return 0
+
+    results = {
+        'meta': {
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'managers': {},
+    }
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, DB_NAME=os.path.join(directory, 'bench.db'), METRICS_PORT='0')
+            results['managers'][str(rows)] = run_worker(['--rows', str(rows)], args.repeat, env)
+        for name, value in results['managers'][str(rows)].items():
+            if 'mean' in value:
+                print(f"{rows:>8} {name:35} {value['mean'] * 1000:10.3f} ms", file=sys.stderr)
+
+    results['parsers'] = run_worker(['--parsers'], args.repeat, dict(os.environ, METRICS_PORT='0'))
+    for name, value in results['parsers'].items():
+        print(f"{'':>8} {name:35} {value['items_per_second']:10.0f} vacancies/s", file=sys.stderr)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
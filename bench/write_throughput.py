@@ -0,0 +1,82 @@
+"""
+Пропускная способность записей TaskManager через AsyncManager
+при разных режимах журнала и группового коммита.
+
+    python -m bench.write_throughput [--writes 2000] [--concurrency 50]
+
+Каждая конфигурация запускается в отдельном процессе со своей временной базой,
+потому что настройки SqliteDB читаются из окружения при импорте.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+CONFIGS = {
+    'rollback journal, commit per write': {
+        'DB_JOURNAL_MODE': 'DELETE', 'DB_SYNCHRONOUS': 'FULL', 'DB_COMMIT_WINDOW': '0', 'DB_COMMIT_BATCH': '1',
+    },
+    'WAL, commit per write': {
+        'DB_JOURNAL_MODE': 'WAL', 'DB_SYNCHRONOUS': 'NORMAL', 'DB_COMMIT_WINDOW': '0', 'DB_COMMIT_BATCH': '1',
+    },
+    'WAL, group commit': {
+        'DB_JOURNAL_MODE': 'WAL', 'DB_SYNCHRONOUS': 'NORMAL', 'DB_COMMIT_WINDOW': '0.002', 'DB_COMMIT_BATCH': '256',
+    },
+}
+
+
+async def run_writes(writes: int, concurrency: int) -> float:
+    from core.database import AsyncManager, SqliteDB
+    from task.manager import TaskManager
+
+    task = AsyncManager(TaskManager(SqliteDB()))
+    semaphore = asyncio.Semaphore(concurrency)
+    today = datetime.date.today()
+
+    async def write(number: int):
+        async with semaphore:
+            await task.create(number % concurrency, f'task {number}', '', today, 'В процессе')
+
+    started = time.perf_counter()
+    await asyncio.gather(*(write(number) for number in range(writes)))
+    return time.perf_counter() - started
+
+
+def worker(writes: int, concurrency: int) -> None:
+    elapsed = asyncio.run(run_writes(writes, concurrency))
+    print(json.dumps({'writes': writes, 'seconds': elapsed, 'writes_per_second': writes / elapsed}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writes', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.writes, args.concurrency)
+        return
+
+    results = {}
+    for name, config in CONFIGS.items():
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, DB_NAME=os.path.join(directory, 'bench.db'), **config)
+            output = subprocess.run(
+                [sys.executable, '-m', 'bench.write_throughput', '--worker',
+                 '--writes', str(args.writes), '--concurrency', str(args.concurrency)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+        print(f"{name:40} {results[name]['writes_per_second']:10.0f} writes/s")
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from core.settings import RECORD_CACHE_SIZE
+
+
+class RecordCache:
+    """
+    Ограниченный LRU-кэш записей по id со счетчиками попаданий.
+
+    Любая инвалидация увеличивает version. Читатель запоминает version
+    до запроса в базу и кладет результат через put(..., version), поэтому
+    строка, прочитанная до записи, не вернется в кэш после ее инвалидации.
+    """
+
+    def __init__(self, max_size: int = RECORD_CACHE_SIZE):
+        self.max_size = max_size
+        self.records: OrderedDict = OrderedDict()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<RecordCache(size={len(self.records)}, max_size={self.max_size})>"
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        with self.lock:
+            record = self.records.get(key)
+            if record is None:
+                self.misses += 1
+                return None
+            self.records.move_to_end(key)
+            self.hits += 1
+            return dict(record)
+
+    def put(self, key: Hashable, record: Dict, version: int) -> None:
+        """Кладет запись, если с момента version ничего не инвалидировалось."""
+        with self.lock:
+            if version != self.version:
+                return
+            self.records[key] = dict(record)
+            self.records.move_to_end(key)
+            while len(self.records) > self.max_size:
+                self.records.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self.lock:
+            self.version += 1
+            self.records.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.version += 1
+            self.records.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self.records),
+            }
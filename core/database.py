@@ -1,17 +1,50 @@
+import asyncio
+import functools
+import logging
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 
-from core.settings import DATABASE
+from core.metrics import TimedConnection
+from core.settings import (DATABASE, DB_CACHE_SIZE_KB, DB_COMMIT_BATCH,
+                           DB_COMMIT_WINDOW, DB_JOURNAL_MODE, DB_READERS,
+                           DB_SYNCHRONOUS)
+
+# SQL-версия job.manager.vacancy_key. py_lower вместо lower(): встроенный lower()
+# меняет регистр только у ASCII, и ключи кириллических вакансий не совпали бы с Python
+VACANCY_KEY_SQL = """
+    CASE
+        WHEN trim(ifnull(link, '')) != '' THEN py_lower(rtrim(trim(link), '/'))
+        ELSE py_lower(trim(title)) || '|' || py_lower(trim(ifnull(company, '')))
+    END
+"""
 
 
 class SqliteDB:
-    """Обеспечивает подключение к базе данных Sqlite3"""
+    """
+    Обеспечивает подключение к базе данных Sqlite3.
+
+    connection — соединение единственного потока-писателя (writer),
+    все изменения выполняются в нем по очереди. Чтения идут в пуле
+    readers, у каждого потока-читателя свое соединение.
+    """
 
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.connection = sqlite3.connect(DATABASE)
+            cls._instance.connection = cls._connect()
+            cls._instance.connection.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+            cls._instance.local = threading.local()
+            cls._instance.writer = GroupCommitWriter(cls._instance)
+            if DATABASE == ':memory:':
+                # У базы в памяти нет второго соединения — читаем через писателя
+                cls._instance.readers = cls._instance.writer
+            else:
+                cls._instance.readers = ThreadPoolExecutor(max_workers=DB_READERS, thread_name_prefix='db-reader')
         return cls._instance
 
     def __init__(self):
@@ -20,19 +53,75 @@ class SqliteDB:
     def __repr__(self):
         return f"<SqliteDB(connection={self.connection})>"
 
+    @staticmethod
+    def _connect() -> sqlite3.Connection:
+        # TimedConnection записывает время каждого запроса в метрику db_statement_seconds
+        connection = sqlite3.connect(DATABASE, check_same_thread=False, factory=TimedConnection)
+        connection.row_factory = sqlite3.Row
+        connection.create_function('py_lower', 1, lambda value: value.lower() if value else value,
+                                   deterministic=True)
+        connection.execute("PRAGMA foreign_keys = ON")
+        # В режиме WAL synchronous=NORMAL не теряет целостность, fsync делается на checkpoint
+        connection.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        connection.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        return connection
+
+    def commit(self):
+        """
+        Фиксирует транзакцию. Внутри пакета GroupCommitWriter ничего не делает:
+        пакет фиксируется писателем одним коммитом.
+        """
+        if not getattr(self.local, 'in_batch', False):
+            self.connection.commit()
+
+    def rollback(self):
+        """Откатывает транзакцию. Внутри пакета откат делает GroupCommitWriter."""
+        if not getattr(self.local, 'in_batch', False):
+            self.connection.rollback()
+
+    def on_commit(self, callback, *args):
+        """
+        Вызывает callback(*args) после фиксации текущей записи:
+        внутри пакета — после коммита пакета, иначе сразу.
+        """
+        if getattr(self.local, 'in_batch', False):
+            self.local.on_commit.append(functools.partial(callback, *args))
+        else:
+            callback(*args)
+
+    def read_connection(self) -> sqlite3.Connection:
+        """Соединение для чтения, свое у каждого потока."""
+        if DATABASE == ':memory:':
+            return self.connection
+        if not hasattr(self.local, 'connection'):
+            self.local.connection = self._connect()
+        return self.local.connection
+
     def _create_tables(self):
         cursor = self.connection.cursor()
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS tasks (
                 id INTEGER PRIMARY KEY AUTOINCREMENT, -- Уникальный идентификатор
+                chat_id INTEGER,                      -- Чат, которому принадлежит задача
                 title TEXT NOT NULL,                  -- Название задачи (обязательно)
                 description TEXT,                     -- Описание задачи (необязательно)
-                date DATETIME,                        -- Дата выполнения задачи (в формате ISO)
-                status TEXT DEFAULT 'Not Started'     -- Статус задачи (по умолчанию "Not Started")
+                date DATETIME,                        -- Дата выполнения задачи ('YYYY-MM-DD HH:MM:SS')
+                status TEXT DEFAULT 'Not Started',    -- Статус задачи (по умолчанию "Not Started")
+                remind_at DATETIME                    -- Когда напомнить (NULL — напоминание не нужно/отправлено)
             )
             """
         )
+        self._add_column(cursor, 'tasks', 'chat_id', 'INTEGER')
+        self._add_column(cursor, 'tasks', 'remind_at', 'DATETIME')
+        cursor.execute("DROP INDEX IF EXISTS tasks_date")
+        cursor.execute("CREATE INDEX IF NOT EXISTS tasks_chat_date ON tasks (chat_id, date, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS tasks_chat_status ON tasks (chat_id, status)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_remind_at ON tasks (remind_at, id) WHERE remind_at IS NOT NULL"
+        )
+        self._migrate(cursor)
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS jobs (
@@ -42,16 +131,245 @@ class SqliteDB:
                 link TEXT,                            -- Ссылка на вакансию
                 salary TEXT,                          -- Зарплата
                 job_type TEXT,                        -- Тип работы  
-                status TEXT                           -- Статус  
+                status TEXT,                          -- Статус  
+                content_hash TEXT,                    -- Хэш содержимого вакансии
+                vacancy_key TEXT                      -- Нормализованный ключ вакансии (уникальный)
             )
             """
         )
+        self._add_column(cursor, 'jobs', 'content_hash', 'TEXT')
+        if self._add_column(cursor, 'jobs', 'vacancy_key', 'TEXT'):
+            self._fill_vacancy_keys(cursor)
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS jobs_vacancy_key ON jobs (vacancy_key)")
+        self._create_jobs_fts(cursor)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chat_jobs (
+                chat_id INTEGER NOT NULL,             -- Чат пользователя
+                job_id INTEGER NOT NULL REFERENCES jobs (id) ON DELETE CASCADE, -- Вакансия
+                status TEXT DEFAULT 'Новая',          -- Статус вакансии для этого чата
+                PRIMARY KEY (chat_id, job_id)
+            ) WITHOUT ROWID
+            """
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS chat_jobs_status ON chat_jobs (chat_id, status, job_id)")
         self.connection.commit()
 
+    @staticmethod
+    def _migrate(cursor):
+        """Переносит данные старых версий схемы. Версия хранится в PRAGMA user_version."""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Даты задач писались то как 'YYYY-MM-DD', то как datetime с микросекундами;
+            # приводим все к 'YYYY-MM-DD HH:MM:SS', чтобы сравнение строк совпадало со сравнением дат
+            cursor.execute(
+                """
+                UPDATE tasks SET date = datetime(date)
+                WHERE date IS NOT NULL AND datetime(date) IS NOT NULL AND date != datetime(date)
+                """
+            )
+            cursor.execute("PRAGMA user_version = 1")
+        if version < 2:
+            # Напоминания жили только в памяти планировщика и терялись при перезапуске;
+            # восстанавливаем их для незавершенных задач с датой в будущем
+            cursor.execute(
+                """
+                UPDATE tasks SET remind_at = date
+                WHERE remind_at IS NULL AND chat_id IS NOT NULL
+                  AND status = 'В процессе' AND date > datetime('now', 'localtime')
+                """
+            )
+            cursor.execute("PRAGMA user_version = 2")
+
+    @staticmethod
+    def _add_column(cursor, table: str, column: str, definition: str) -> bool:
+        """
+        Добавляет колонку в таблицу, созданную до ее появления в схеме.
+        :return: True, если колонка была добавлена.
+        """
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            return True
+        return False
+
+    @staticmethod
+    def _fill_vacancy_keys(cursor):
+        """
+        Заполняет vacancy_key у вакансий, сохраненных до его появления,
+        и удаляет дубликаты, оставляя самую раннюю запись.
+        """
+        cursor.execute(f"UPDATE jobs SET vacancy_key = {VACANCY_KEY_SQL}")
+        cursor.execute(
+            "DELETE FROM jobs WHERE id NOT IN (SELECT min(id) FROM jobs GROUP BY vacancy_key)"
+        )
+
+    def _create_jobs_fts(self, cursor):
+        """
+        Полнотекстовый индекс FTS5 по названию, компании и типу работы вакансий.
+        unicode61 приводит к нижнему регистру и кириллицу, и латиницу,
+        а '+' и '#' остаются частью слова (C++, C#).
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+        ).fetchone()
+        cursor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                title, company, job_type,
+                content='jobs', content_rowid='id',
+                tokenize="unicode61 remove_diacritics 2 tokenchars '+#'"
+            )
+            """
+        )
+        cursor.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+                INSERT INTO jobs_fts (rowid, title, company, job_type)
+                VALUES (new.id, new.title, new.company, new.job_type);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, title, company, job_type)
+                VALUES ('delete', old.id, old.title, old.company, old.job_type);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, job_type ON jobs BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, title, company, job_type)
+                VALUES ('delete', old.id, old.title, old.company, old.job_type);
+                INSERT INTO jobs_fts (rowid, title, company, job_type)
+                VALUES (new.id, new.title, new.company, new.job_type);
+            END;
+            """
+        )
+        if not exists:
+            # Индексируем вакансии, сохраненные до появления jobs_fts
+            cursor.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+
     def close(self):
-        """Закрывает соединение с базой данных."""
+        """Дожидается очереди записей и закрывает соединение с базой данных."""
+        self.writer.shutdown(wait=True)
+        self.readers.shutdown(wait=True)
         self.connection.close()
 
     def __del__(self):
         if hasattr(self, "connection"):
             self.connection.close()
+
+
+class AsyncManager:
+    """
+    Awaitable-обертка над TaskManager/JobManager для асинхронных обработчиков.
+    Методы из manager.read_methods выполняются в пуле читателей,
+    остальные — в единственном потоке-писателе, так что обращение
+    к базе никогда не блокирует цикл событий.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __repr__(self):
+        return f"<AsyncManager(manager={self.manager})>"
+
+    def __getattr__(self, name):
+        method = getattr(self.manager, name)
+        db = self.manager.db
+        executor = db.readers if name in self.manager.read_methods else db.writer
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(method, *args, **kwargs))
+
+        return call
+
+
+class GroupCommitWriter(Executor):
+    """
+    Поток-писатель с групповым коммитом. Записи, пришедшие в течение
+    window секунд (но не больше max_batch), выполняются в одной транзакции
+    и фиксируются одним коммитом — одним fsync на пакет вместо одного на запись.
+    Каждая запись выполняется в своем SAVEPOINT, поэтому ошибка одной записи
+    откатывает только ее. Future записи завершается после коммита пакета.
+    """
+
+    def __init__(self, db: SqliteDB, window: float = DB_COMMIT_WINDOW, max_batch: int = DB_COMMIT_BATCH):
+        self.db = db
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self.thread.start()
+
+    def __repr__(self):
+        return f"<GroupCommitWriter(window={self.window}, max_batch={self.max_batch})>"
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        self.queue.put((future, functools.partial(fn, *args, **kwargs)))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        connection = self.db.connection
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+
+            batch = self._collect(item)
+            results = []
+            self.db.local.in_batch = True
+            self.db.local.on_commit = []
+            try:
+                if connection.in_transaction:
+                    connection.commit()
+                connection.execute("BEGIN")
+                for future, call in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    connection.execute("SAVEPOINT batch_item")
+                    try:
+                        results.append((future, call(), None))
+                        connection.execute("RELEASE batch_item")
+                    except BaseException as e:
+                        connection.execute("ROLLBACK TO batch_item")
+                        connection.execute("RELEASE batch_item")
+                        results.append((future, None, e))
+                connection.commit()
+            except Exception as e:
+                logging.error(f"Ошибка при фиксации пакета записей: {e}")
+                if connection.in_transaction:
+                    connection.rollback()
+                results = [(future, None, e) for future, _ in batch if not future.cancelled()]
+            finally:
+                self.db.local.in_batch = False
+
+            for callback in self.db.local.on_commit:
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f"Ошибка в обработчике коммита: {e}")
+
+            for future, result, error in results:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
@@ -0,0 +1,231 @@
+import asyncio
+import datetime
+import logging
+import time
+from collections import deque
+from typing import Dict
+
+from telegram import Bot
+from telegram.error import RetryAfter
+
+from core.settings import (NOTIFY_CHAT_BURST, NOTIFY_CHAT_RATE,
+                           NOTIFY_GLOBAL_BURST, NOTIFY_GLOBAL_RATE,
+                           NOTIFY_MAX_RETRIES, NOTIFY_QUEUE_SIZE,
+                           NOTIFY_WORKERS)
+
+
+class TokenBucket:
+    """
+    Token bucket для event loop: reserve() забирает токен (уходя в минус,
+    если их нет) и возвращает, сколько секунд нужно подождать до отправки.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def idle(self) -> bool:
+        """Бакет полон — его можно выбросить без потери ограничения."""
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class NotificationDispatcher:
+    """
+    Очередь исходящих сообщений бота.
+
+    Воркеры отправляют сообщения через application.bot, соблюдая лимиты
+    Telegram: token bucket на чат и общий на бота. Сообщение чата, у которого
+    закончились токены, откладывается до своего времени и возвращается в очередь,
+    а воркер берет следующее — всплеск в один чат не задерживает остальные.
+    Всех воркеров останавливают только общий лимит и 429 (RetryAfter):
+    отправка приостанавливается на указанное время и сообщение повторяется.
+    """
+
+    # Сколько бакетов чатов держать, прежде чем выбрасывать простаивающие
+    max_chat_buckets = 10000
+
+    def __init__(self, bot: Bot, workers: int = NOTIFY_WORKERS, queue_size: int = NOTIFY_QUEUE_SIZE,
+                 global_rate: float = NOTIFY_GLOBAL_RATE, global_burst: float = NOTIFY_GLOBAL_BURST,
+                 chat_rate: float = NOTIFY_CHAT_RATE, chat_burst: float = NOTIFY_CHAT_BURST,
+                 max_retries: int = NOTIFY_MAX_RETRIES):
+        """
+        :param bot: Бот приложения (application.bot).
+        :param workers: Количество параллельных отправителей.
+        :param queue_size: Сколько сообщений может ждать отправки; при переполнении send_message ждет.
+        :param global_rate: Сообщений в секунду на бота.
+        :param chat_rate: Сообщений в секунду на один чат.
+        :param max_retries: Сколько раз повторять сообщение после RetryAfter.
+        """
+        self.bot = bot
+        self.workers = workers
+        # Очередь без лимита: отложенные сообщения возвращаются в нее без ожидания,
+        # а размер ограничивает semaphore в send_message
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.capacity = asyncio.Semaphore(queue_size)
+        # Отложенные сообщения по таймерам, которые вернут их в очередь
+        self.parked: Dict[asyncio.TimerHandle, tuple] = {}
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chat_buckets: Dict[int, TokenBucket] = {}
+        self.max_retries = max_retries
+        self.paused_until = 0.0
+        self.tasks = []
+
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=1000)
+
+    def __repr__(self):
+        return f"<NotificationDispatcher(workers={self.workers}, queued={self.queue.qsize()}, parked={len(self.parked)})>"
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> asyncio.Future:
+        """
+        Ставит сообщение в очередь.
+        :return: Future с отправленным Message (или исключением).
+        """
+        await self.capacity.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((time.monotonic(), chat_id, text, kwargs, future, False))
+        return future
+
+    def chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= self.max_chat_buckets:
+                self.chat_buckets = {key: value for key, value in self.chat_buckets.items() if not value.idle()}
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def park(self, delay: float, item: tuple) -> None:
+        """Возвращает сообщение в очередь через delay секунд, не занимая воркера."""
+
+        def release():
+            del self.parked[handle]
+            self.queue.put_nowait(item)
+
+        handle = asyncio.get_running_loop().call_later(delay, release)
+        self.parked[handle] = item
+
+    async def throttle(self) -> None:
+        """Общий лимит бота и пауза после RetryAfter — единственные ожидания для всех воркеров."""
+        await asyncio.sleep(self.global_bucket.reserve())
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    async def deliver(self, chat_id: int, text: str, kwargs: dict):
+        for attempt in range(self.max_retries + 1):
+            await self.throttle()
+            try:
+                return await self.bot.send_message(chat_id, text, **kwargs)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = e.retry_after
+                if isinstance(delay, datetime.timedelta):
+                    delay = delay.total_seconds()
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                self.retries += 1
+                logging.warning(f"Telegram просит подождать {delay} с перед отправкой в чат {chat_id}")
+
+    async def worker(self) -> None:
+        while True:
+            item = await self.queue.get()
+            enqueued_at, chat_id, text, kwargs, future, reserved = item
+            try:
+                if not reserved:
+                    # Токен чата резервируется заранее, поэтому отложенные сообщения
+                    # одного чата выходят из очереди в порядке постановки
+                    delay = self.chat_bucket(chat_id).reserve()
+                    if delay > 0:
+                        self.park(delay, (enqueued_at, chat_id, text, kwargs, future, True))
+                        continue
+                message = await self.deliver(chat_id, text, kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                self.capacity.release()
+                raise
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"Не удалось отправить сообщение в чат {chat_id}: {e}")
+                if not future.cancelled():
+                    future.set_exception(e)
+                self.capacity.release()
+            else:
+                self.sent += 1
+                self.latencies.append(time.monotonic() - enqueued_at)
+                if not future.cancelled():
+                    future.set_result(message)
+                self.capacity.release()
+            finally:
+                self.queue.task_done()
+
+    def start(self) -> None:
+        if not self.tasks:
+            self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def drain(self) -> None:
+        """Ждет, пока не будут отправлены и очередь, и отложенные сообщения."""
+        while True:
+            await self.queue.join()
+            if not self.parked:
+                return
+            await asyncio.sleep(0.05)
+
+    async def stop(self, timeout: float = 5) -> None:
+        """Дожидается отправки очереди (не дольше timeout) и останавливает воркеров."""
+        if not self.tasks:
+            return
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Не отправлено сообщений при остановке: {self.queue.qsize() + len(self.parked)}")
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+        # Неотправленные сообщения: таймеры отменяем, иначе они вернут сообщения
+        # в очередь без воркеров, а их future не завершатся и не освободят место
+        pending = list(self.parked.values())
+        for handle in self.parked:
+            handle.cancel()
+        self.parked.clear()
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+            self.queue.task_done()
+        for _, chat_id, _, _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError(f"Диспетчер остановлен, сообщение в чат {chat_id} не отправлено"))
+            self.capacity.release()
+
+    def stats(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            'queue_depth': self.queue.qsize(),
+            'parked': len(self.parked),
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': latencies[-1] if latencies else 0.0,
+        }
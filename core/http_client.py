@@ -0,0 +1,70 @@
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.metrics import http_seconds
+from core.settings import (HTTP_BACKOFF_FACTOR, HTTP_BACKOFF_JITTER,
+                           HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_RETRY_AFTER_MAX,
+                           HTTP_TIMEOUT)
+
+
+class CappedRetry(Retry):
+    """
+    Retry, который ждет по Retry-After не дольше HTTP_RETRY_AFTER_MAX секунд:
+    источник с Retry-After: 3600 иначе на час занял бы поток парсера.
+    """
+
+    max_retry_after = HTTP_RETRY_AFTER_MAX
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+class HttpClient(requests.Session):
+    """
+    Общий на процесс HTTP-клиент: пул keep-alive соединений,
+    таймаут по умолчанию и повторы с экспоненциальной задержкой
+    и джиттером на 429/5xx с учетом заголовка Retry-After (ограниченного сверху).
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, timeout: float = HTTP_TIMEOUT,
+                 retries: int = HTTP_RETRIES):
+        super().__init__()
+        self.timeout = timeout
+        retry = CappedRetry(
+            total=retries,
+            status_forcelist=(429, 500, 502, 503, 504),
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            backoff_jitter=HTTP_BACKOFF_JITTER,
+            respect_retry_after_header=True,
+            # После последней попытки возвращаем ответ как есть, его проверит raise_for_status
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def __repr__(self):
+        return f"<HttpClient(timeout={self.timeout})>"
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        # Время считается вместе с повторами — столько ждет вызывающий код
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            response = super().request(method, url, **kwargs)
+            status = str(response.status_code)
+            return response
+        finally:
+            http_seconds.observe(time.perf_counter() - started, urlsplit(url).hostname or '', status)
+
+
+http_client = HttpClient()
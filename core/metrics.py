@@ -0,0 +1,214 @@
+import bisect
+import logging
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from core.settings import METRICS_HOST, METRICS_PORT
+
+# Границы бакетов гистограмм задержек, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus (накопительные бакеты, _sum, _count)."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple, List] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for labels, (counts, total, count) in sorted(self.series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    bucket_labels = format_labels(self.labels, labels, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                bucket_labels = format_labels(self.labels, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {total}")
+                lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.series: Dict[Tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.series.items()):
+                lines.append(f"{self.name}{format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class GaugeCallback:
+    """Gauge, значения которого на момент выгрузки отдает callback: {значения меток: число}."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], callback: Callable[[], Dict[Tuple, float]]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.callback = callback
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            values = self.callback()
+        except Exception as e:
+            logging.error(f"Не удалось собрать метрику {self.name}: {e}")
+            return lines
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+handler_seconds = registry.register(Histogram('bot_handler_seconds', 'Handler latency', ('handler',)))
+handler_errors = registry.register(Counter('bot_handler_errors_total', 'Handler exceptions', ('handler',)))
+update_seconds = registry.register(Histogram('bot_update_seconds', 'Update processing latency', ('kind',)))
+update_wait_seconds = registry.register(
+    Histogram('bot_update_wait_seconds', 'Time an update waits behind earlier updates of its chat', ('kind',))
+)
+sql_seconds = registry.register(Histogram('db_statement_seconds', 'SQL statement latency', ('statement',)))
+http_seconds = registry.register(Histogram('http_request_seconds', 'Outbound HTTP latency', ('host', 'status')))
+
+
+SQL_TARGET = re.compile(r'^\s*(?=(\w+))(?:.*?\b(?:FROM|INTO|UPDATE|ON|TABLE(?: IF NOT EXISTS)?)\s+(\w+))?', re.I | re.S)
+
+
+def statement_label(sql: str) -> str:
+    """'SELECT * FROM tasks WHERE ...' -> 'SELECT tasks'."""
+    match = SQL_TARGET.match(sql)
+    if match is None:
+        return 'OTHER'
+    verb, table = match.groups()
+    return f"{verb.upper()} {table}" if table else verb.upper()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Курсор, записывающий время execute* в db_statement_seconds."""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            sql_seconds.observe(time.perf_counter() - started, statement_label(sql))
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            sql_seconds.observe(time.perf_counter() - started, statement_label(sql))
+
+    def executescript(self, sql_script):
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            sql_seconds.observe(time.perf_counter() - started, 'SCRIPT')
+
+
+class TimedConnection(sqlite3.Connection):
+    """Соединение, курсоры которого по умолчанию TimedCursor."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> ThreadingHTTPServer or None:
+    """
+    Поднимает /metrics в формате Prometheus в фоновом потоке.
+    :param port: Порт; 0 — не запускать.
+    :return: Сервер или None, если он выключен или порт занят — бот работает и без метрик.
+    """
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        logging.error(f"Не удалось запустить метрики на {host}:{port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    logging.info(f"Метрики доступны на http://{host}:{port}/metrics")
+    return server
@@ -5,5 +5,72 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BOT_TOKEN = os.getenv("BOT_TOKEN", "asjdnjsbfvsdhbsjfb")
+# Адрес Bot API; для нагрузочных тестов его можно направить на bench.fake_bot_api
+TELEGRAM_BASE_URL = os.getenv("TELEGRAM_BASE_URL", "https://api.telegram.org/bot")
+TELEGRAM_BASE_FILE_URL = os.getenv("TELEGRAM_BASE_FILE_URL", "https://api.telegram.org/file/bot")
+
+# Если WEBHOOK_URL задан, бот получает апдейты через вебхук, иначе long polling
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8443))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "")
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", 40))
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", 64))
+
+# Метрики Prometheus на http://METRICS_HOST:METRICS_PORT/metrics (0 — выключены, по умолчанию)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+SLOW_UPDATE_THRESHOLD = float(os.getenv("SLOW_UPDATE_THRESHOLD", 1.0))
 
 DATABASE = os.getenv("DB_NAME", "example.db")
+DB_READERS = int(os.getenv("DB_READERS", 4))
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", 20000))
+DB_COMMIT_WINDOW = float(os.getenv("DB_COMMIT_WINDOW", 0.002))
+DB_COMMIT_BATCH = int(os.getenv("DB_COMMIT_BATCH", 256))
+RECORD_CACHE_SIZE = int(os.getenv("RECORD_CACHE_SIZE", 1024))
+
+PARSER_MAX_WORKERS = int(os.getenv("PARSER_MAX_WORKERS", 8))
+PARSER_TIMEOUT = float(os.getenv("PARSER_TIMEOUT", 10))
+# Адреса источников; для нагрузочных тестов их можно направить на bench.fake_sources
+DEV_KG_URL = os.getenv("DEV_KG_URL", "https://devkg.com/ru/jobs?page=")
+HEAD_HUNTER_URL = os.getenv("HEAD_HUNTER_URL", "https://api.hh.ru/vacancies")
+
+HTTP_CACHE_DB = os.getenv("HTTP_CACHE_DB", "http_cache.db")
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", 1000))
+DEV_KG_CACHE_TTL = int(os.getenv("DEV_KG_CACHE_TTL", 300))
+HEAD_HUNTER_CACHE_TTL = int(os.getenv("HEAD_HUNTER_CACHE_TTL", 300))
+
+CRAWL_INTERVAL = int(os.getenv("CRAWL_INTERVAL", 1800))
+CRAWL_SOURCE_TIMEOUT = float(os.getenv("CRAWL_SOURCE_TIMEOUT", 300))
+
+REMINDER_BATCH = int(os.getenv("REMINDER_BATCH", 1000))
+REMINDER_POLL_INTERVAL = float(os.getenv("REMINDER_POLL_INTERVAL", 60))
+
+# Лимиты Telegram: ~30 сообщений в секунду на бота и ~1 в секунду в один чат
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", 4))
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", 10000))
+NOTIFY_GLOBAL_RATE = float(os.getenv("NOTIFY_GLOBAL_RATE", 30))
+NOTIFY_GLOBAL_BURST = float(os.getenv("NOTIFY_GLOBAL_BURST", 30))
+NOTIFY_CHAT_RATE = float(os.getenv("NOTIFY_CHAT_RATE", 1))
+NOTIFY_CHAT_BURST = float(os.getenv("NOTIFY_CHAT_BURST", 3))
+NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", 3))
+SEARCH_RESULTS_LIMIT = int(os.getenv("SEARCH_RESULTS_LIMIT", 50))
+VACANCIES_PAGE_SIZE = int(os.getenv("VACANCIES_PAGE_SIZE", 10))
+TASKS_PAGE_SIZE = int(os.getenv("TASKS_PAGE_SIZE", 10))
+
+SOURCE_TIMEOUT = float(os.getenv("SOURCE_TIMEOUT", 15))
+SOURCE_FAILURE_THRESHOLD = int(os.getenv("SOURCE_FAILURE_THRESHOLD", 3))
+SOURCE_RESET_TIMEOUT = float(os.getenv("SOURCE_RESET_TIMEOUT", 300))
+# Потоки для синхронных парсеров; отдельно от пула цикла событий по умолчанию
+SOURCE_THREADS = int(os.getenv("SOURCE_THREADS", 8))
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 16))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+HTTP_BACKOFF_JITTER = float(os.getenv("HTTP_BACKOFF_JITTER", 0.5))
+# Дольше этого по Retry-After не ждем, секунды
+HTTP_RETRY_AFTER_MAX = float(os.getenv("HTTP_RETRY_AFTER_MAX", 5))
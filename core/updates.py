@@ -0,0 +1,138 @@
+import asyncio
+import functools
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import BaseHandler, BaseUpdateProcessor, ConversationHandler
+
+from core.metrics import handler_errors, handler_seconds, update_seconds, update_wait_seconds
+from core.settings import SLOW_UPDATE_THRESHOLD, UPDATE_CONCURRENCY
+
+
+def timed_callback(callback: Callable) -> Callable:
+    """Оборачивает callback хендлера, записывая его время в bot_handler_seconds."""
+    if getattr(callback, '__wrapped__', None) is not None:
+        return callback
+    name = callback.__name__
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except Exception:
+            handler_errors.inc(name)
+            raise
+        finally:
+            handler_seconds.observe(time.perf_counter() - started, name)
+
+    return wrapper
+
+
+def instrument_handler(handler: BaseHandler) -> BaseHandler:
+    """
+    Включает замер времени для хендлера; у ConversationHandler —
+    для всех вложенных хендлеров (entry_points, states, fallbacks).
+    """
+    if isinstance(handler, ConversationHandler):
+        nested = list(handler.entry_points) + list(handler.fallbacks)
+        for handlers in handler.states.values():
+            nested.extend(handlers)
+        for inner in nested:
+            instrument_handler(inner)
+    else:
+        handler.callback = timed_callback(handler.callback)
+    return handler
+
+
+def update_kind(update: object) -> str:
+    """Тип апдейта для меток: message, callback_query и т.п."""
+    if isinstance(update, Update):
+        for kind in ('message', 'callback_query', 'edited_message', 'inline_query'):
+            if getattr(update, kind) is not None:
+                return kind
+        return 'update'
+    return type(update).__name__
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обрабатывает до max_concurrent_updates апдейтов параллельно, но апдейты
+    одного чата — строго по очереди, чтобы состояния ConversationHandler
+    не перепутывались.
+
+    Лимит соблюдает BaseUpdateProcessor.process_update. Если у чата уже есть
+    апдейт в работе, новый апдейт только встает в очередь чата и сразу отдает
+    слот, а выполняет его тот же обработчик следом за текущим. Поэтому чат
+    с накопившимися апдейтами держит не больше одного слота и не задерживает
+    остальные чаты.
+
+    Ожидание очереди чата пишется в bot_update_wait_seconds, а bot_update_seconds
+    и предупреждение о медленном апдейте учитывают только саму обработку.
+    """
+
+    def __init__(self, max_concurrent_updates: int = UPDATE_CONCURRENCY):
+        super().__init__(max_concurrent_updates)
+        # Очереди чатов, у которых есть апдейт в работе: (апдейт, корутина, время постановки)
+        self.pending: Dict[Hashable, Deque[Tuple[object, Awaitable, float]]] = {}
+
+    def __repr__(self):
+        return f"<ChatOrderedUpdateProcessor(max_concurrent_updates={self.max_concurrent_updates})>"
+
+    @staticmethod
+    def ordering_key(update: object) -> Optional[Hashable]:
+        """Ключ очереди: чат, а если его нет (inline-запросы и т.п.) — пользователь."""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return 'chat', update.effective_chat.id
+        if update.effective_user is not None:
+            return 'user', update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        key = self.ordering_key(update)
+        if key is None:
+            await self.run(update, coroutine, time.perf_counter())
+            return
+
+        pending = self.pending.get(key)
+        if pending is not None:
+            pending.append((update, coroutine, time.perf_counter()))
+            return
+
+        pending = self.pending[key] = deque([(update, coroutine, time.perf_counter())])
+        try:
+            while pending:
+                item = pending.popleft()
+                try:
+                    await self.run(*item)
+                except Exception:
+                    # Ошибка одного апдейта не должна оставить очередь чата необработанной
+                    logging.exception(f"Ошибка обработки апдейта {update_kind(item[0])} {key}")
+        finally:
+            del self.pending[key]
+            # Остаются только при отмене (остановка бота)
+            for _, left, _ in pending:
+                if asyncio.iscoroutine(left):
+                    left.close()
+
+    async def run(self, update: object, coroutine: Awaitable, queued_at: float) -> None:
+        started = time.perf_counter()
+        update_wait_seconds.observe(started - queued_at, update_kind(update))
+        try:
+            await coroutine
+        finally:
+            elapsed = time.perf_counter() - started
+            update_seconds.observe(elapsed, update_kind(update))
+            if elapsed > SLOW_UPDATE_THRESHOLD:
+                logging.warning(f"Медленный апдейт ({elapsed:.2f} с): {update_kind(update)} {self.ordering_key(update)}")
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -1,3 +1,6 @@
-DEV_KG_URL = 'https://devkg.com/ru/jobs?page='
-HEAD_HUNTER_URL = 'https://api.hh.ru/vacancies'
-KYRGYZSTAN_AREA_CODE = '48'
\ No newline at end of file
+from core.settings import DEV_KG_URL, HEAD_HUNTER_URL
+
+DEV_KG_PAGES = 8
+KYRGYZSTAN_AREA_CODE = '48'
+HEAD_HUNTER_PER_PAGE = 100
+HEAD_HUNTER_MAX_DEPTH = 2000
@@ -0,0 +1,64 @@
+import logging
+from contextlib import aclosing
+from typing import Dict, List, Tuple
+
+from core.database import AsyncManager
+from core.settings import CRAWL_SOURCE_TIMEOUT
+from job.parser import get_parsers
+from job.parser.base_parser import BaseParser
+from job.parser.fanout import SourceFanOut
+
+
+class VacancyCrawler:
+    """
+    Периодически загружает ленты вакансий всех источников в таблицу jobs.
+    Поиск пользователей отвечает из базы и не ходит в сеть.
+    """
+
+    def __init__(self, job: AsyncManager, parsers: List[BaseParser] = None):
+        """
+        :param job: JobManager в асинхронной обертке.
+        :param parsers: Источники вакансий (по умолчанию все зарегистрированные).
+        """
+        self.job = job
+        self.fanout = SourceFanOut(parsers or get_parsers(), timeout=CRAWL_SOURCE_TIMEOUT)
+
+    def __repr__(self):
+        return f"<VacancyCrawler(fanout={self.fanout})>"
+
+    async def crawl(self) -> int:
+        """
+        Обходит все источники одновременно и сохраняет вакансии.
+        :return: Количество новых вакансий.
+        """
+        results = await self.fanout.gather(self.crawl_source)
+        created = sum(results.values())
+        logging.info(f"Обход источников завершен, новых вакансий: {created}")
+        return created
+
+    async def crawl_source(self, parser: BaseParser) -> int:
+        """
+        Загружает ленту источника постранично.
+        Инкрементальный источник обходится до первой страницы,
+        на которой все вакансии уже сохранены.
+        """
+        created = 0
+        pages = 0
+        async with aclosing(parser.aiter_feed()) as feed:
+            async for vacancies in feed:
+                pages += 1
+                new, known = await self.save(vacancies)
+                created += new
+                if parser.incremental and vacancies and known == len(vacancies):
+                    break
+
+        logging.info(f"{parser.name}: страниц {pages}, новых вакансий {created}")
+        return created
+
+    async def save(self, vacancies: List[Dict]) -> Tuple[int, int]:
+        """
+        Сохраняет страницу вакансий одной транзакцией.
+        :return: (количество новых, количество уже известных).
+        """
+        created = await self.job.bulk_upsert(vacancies)
+        return len(created), len(vacancies) - len(created)
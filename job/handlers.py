@@ -1,9 +1,8 @@
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
+from core.settings import SEARCH_RESULTS_LIMIT, VACANCIES_PAGE_SIZE
 from job.keyboard import vacancies_keyboard, vacancies_list
-from job.parser.dev import DevKG
-from job.parser.hh import HhParser
 
 SEARCH_VACANCY = 0
 
@@ -17,59 +16,64 @@ async def vacancy_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def search_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     job = context.bot_data.get('job')
+    chat_id = update.effective_chat.id
     vacancy = update.message.text
 
-    await update.message.reply_text(
-        text='Вакансии в поиске'
-    )
-
-    dev_kg = DevKG()
-    hh = HhParser()
-    dev_kg_vacancies: list = dev_kg.search_vacancies(vacancy.lower())
-    hh_vacancies: list = hh.search_vacancies(vacancy.lower())
+    vacancies = await job.search(vacancy, limit=SEARCH_RESULTS_LIMIT, chat_id=chat_id)
 
-    keyboard = []
-
-    for vacancy in dev_kg_vacancies + hh_vacancies:
-        obj, is_create = job.get_or_create(
-            title=vacancy.get('title'),
-            company=vacancy.get('company'),
-            link=vacancy.get('link'),
-            salary=vacancy.get('salary'),
-            job_type=vacancy.get('job_type'),
+    if vacancies:
+        await job.save_for_chat(chat_id, [vacancy.get('id') for vacancy in vacancies])
+        await update.message.reply_text(
+            text="Вот вакансии по этой теме",
+            reply_markup=vacancies_keyboard(vacancies)
+        )
+    else:
+        await update.message.reply_text(
+            text="Вакансий по этой теме пока нет"
         )
-
-        if is_create:
-            keyboard.append([InlineKeyboardButton(
-                f"{obj.get('title', '')[:35]} - {obj.get('company')}",
-                callback_data=f"vacancy_{obj.get('id')}")])
-
-
-    await update.message.reply_text(
-        text="Вот новые вакансии по этой теме",
-        reply_markup=InlineKeyboardMarkup(keyboard)
-    )
     return ConversationHandler.END
 
+
 async def vacancies_list_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     job = context.bot_data.get('job')
-    vacancies = job.all()
+    chat_id = update.effective_chat.id
+    data = update.callback_query.data if update.callback_query else ''
+
+    if data.startswith('vacancies_list_after_'):
+        after_id = int(data.split('_')[-1])
+        vacancies, has_next = await job.page(chat_id, after_id=after_id, limit=VACANCIES_PAGE_SIZE)
+        keyboard = vacancies_keyboard(vacancies, has_previous=True, has_next=has_next)
+    elif data.startswith('vacancies_list_before_'):
+        before_id = int(data.split('_')[-1])
+        vacancies, has_previous = await job.page(chat_id, before_id=before_id, limit=VACANCIES_PAGE_SIZE)
+        keyboard = vacancies_keyboard(vacancies, has_previous=has_previous, has_next=True)
+    else:
+        vacancies, has_next = await job.page(chat_id, limit=VACANCIES_PAGE_SIZE)
+        keyboard = vacancies_keyboard(vacancies, has_next=has_next)
+
     if update.message:
         await update.message.reply_text(
                 text="Список вакансий",
-                reply_markup=vacancies_keyboard(vacancies)
+                reply_markup=keyboard
             )
+    elif data != 'vacancies_list':
+        await update.callback_query.edit_message_text(
+            text="Список вакансий",
+            reply_markup=keyboard
+        )
     else:
         await update.callback_query.message.reply_text(
             text="Список вакансий",
-            reply_markup=vacancies_keyboard(vacancies)
+            reply_markup=keyboard
         )
 
+
 async def vacancy_detail(update: Update, context: ContextTypes.DEFAULT_TYPE):
     job = context.bot_data.get('job')
     id = update.callback_query.data.split('_')[-1]
-    vacancy = job.get(id=id)
+    vacancy = await job.get(id=id)
     if vacancy:
+        await job.set_status(update.effective_chat.id, vacancy.get('id'), 'Просмотрен')
         await update.callback_query.message.reply_text(
             text=f"Название: {vacancy.get('title')}\n"
                  f"Компания:  {vacancy.get('company')}\n"
@@ -1,7 +1,7 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 
-def vacancies_keyboard(vacancies):
+def vacancies_keyboard(vacancies, has_previous=False, has_next=False):
     keyboard = []
 
     for vacancy in vacancies:
@@ -9,6 +9,14 @@ def vacancies_keyboard(vacancies):
         keyboard.append([InlineKeyboardButton(f"{vacancy.get('title', '')[:35]} - {vacancy.get('company')} {'✅' if mark else '❌'}",
                                               callback_data=f"vacancy_{vacancy.get('id')}")])
 
+    navigation = []
+    if has_previous and vacancies:
+        navigation.append(InlineKeyboardButton('⬅️', callback_data=f"vacancies_list_before_{vacancies[0].get('id')}"))
+    if has_next and vacancies:
+        navigation.append(InlineKeyboardButton('➡️', callback_data=f"vacancies_list_after_{vacancies[-1].get('id')}"))
+    if navigation:
+        keyboard.append(navigation)
+
     return InlineKeyboardMarkup(keyboard)
 
 def vacancies_list(url):
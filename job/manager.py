@@ -1,9 +1,38 @@
+import hashlib
 import logging
+import re
 import sqlite3
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
+
+from core.cache import RecordCache
+
+
+def vacancy_key(job: Dict) -> str:
+    """
+    Нормализованный ключ вакансии: ссылка без регистра и завершающего '/',
+    а если ссылки нет — название и компания.
+    """
+    link = (job.get('link') or '').strip().rstrip('/').lower()
+    if link:
+        return link
+    return f"{(job.get('title') or '').strip().lower()}|{(job.get('company') or '').strip().lower()}"
+
+
+def content_hash(job: Dict) -> str:
+    """Хэш полей вакансии, по которому видно, что она изменилась на источнике."""
+    content = "\x1f".join(str(job.get(key) or '') for key in ('title', 'company', 'salary', 'job_type'))
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 
 class JobManager:
+    # Методы только для чтения: AsyncManager выполняет их в пуле читателей
+    read_methods = ('get', 'all', 'page', 'search', 'filter')
+
     def __init__(self, db: sqlite3):
         """
         Менеджер для работы с таблицей jobs.
@@ -12,67 +41,102 @@ class JobManager:
         self.db = db
         self.connection = db.connection
         self.connection.row_factory = sqlite3.Row
+        self.cache = RecordCache()
 
     def create(self, company: str, title: str, link: str, salary: str, job_type: str, status: str) -> None:
         """Создает задачу"""
+        job = dict(company=company, title=title, link=link, salary=salary, job_type=job_type)
         cursor = self.connection.cursor()
         cursor.execute(
             """
-            INSERT INTO jobs (company, title, link, salary, job_type, status)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO jobs (company, title, link, salary, job_type, status, content_hash, vacancy_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (company, title, link, salary, job_type, status),
+            (company, title, link, salary, job_type, status, content_hash(job), vacancy_key(job)),
         )
-        self.connection.commit()
+        self.db.commit()
 
-    def bulk_create(self, jobs: List[Dict[str, str]]):
+    def bulk_upsert(self, jobs: List[Dict[str, str]]) -> List[Dict]:
         """
-        Добавляет вакансии в базу данных. Если вакансия уже существует, она пропускается.
+        Сохраняет вакансии одной транзакцией.
+        Новые вакансии добавляются, у известных (по vacancy_key) обновляются
+        поля, если изменился хэш содержимого, остальные не трогаются.
 
         :param jobs: Список вакансий в виде словарей, где ключи — названия столбцов.
+        :return: Новые вакансии в том виде, в каком они сохранены в базе.
         """
+        rows = {}
+        for job in jobs:
+            rows[vacancy_key(job)] = (
+                job.get("company"), job.get("title"), job.get("link"), job.get("salary"),
+                job.get("job_type"), job.get("status") or 'Новая', content_hash(job), vacancy_key(job),
+            )
+        if not rows:
+            return []
+
         cursor = self.connection.cursor()
         try:
-            sql = """
-            INSERT INTO jobs (company, title, link, salary, job_type, status)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (company, title) DO NOTHING
-            """
-            job_values = [
-                (job["company"], job["title"], job["link"], job["salary"], job["job_type"], job["status"])
-                for job in jobs
-            ]
-
-            cursor.executemany(sql, job_values)
-            self.connection.commit()
-            logging.info(f"{cursor.rowcount} новых вакансий добавлено.")
+            known = set()
+            for keys in chunks(list(rows), 500):
+                placeholders = ", ".join(["?"] * len(keys))
+                cursor.execute(f"SELECT vacancy_key FROM jobs WHERE vacancy_key IN ({placeholders})", keys)
+                known.update(row[0] for row in cursor.fetchall())
+
+            cursor.executemany(
+                """
+                INSERT INTO jobs (company, title, link, salary, job_type, status, content_hash, vacancy_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (vacancy_key) DO UPDATE SET
+                    company = excluded.company,
+                    title = excluded.title,
+                    link = excluded.link,
+                    salary = excluded.salary,
+                    job_type = excluded.job_type,
+                    content_hash = excluded.content_hash
+                WHERE jobs.content_hash IS NOT excluded.content_hash
+                """,
+                list(rows.values()),
+            )
+
+            created = []
+            for keys in chunks([key for key in rows if key not in known], 500):
+                placeholders = ", ".join(["?"] * len(keys))
+                cursor.execute(f"SELECT * FROM jobs WHERE vacancy_key IN ({placeholders}) ORDER BY id", keys)
+                created.extend(dict(row) for row in cursor.fetchall())
+
+            self.db.commit()
+            self.invalidate()
+            logging.info(f"{len(created)} новых вакансий добавлено.")
+            return created
         except Exception as e:
             logging.error(f"Ошибка при сохранении вакансий: {e}")
-            self.connection.rollback()
+            self.db.rollback()
+            raise
         finally:
             cursor.close()
 
     def get_or_create(self, **kwargs) -> Tuple[Any, bool]:
         """
-        Попытаться найти объект. Если не найдено, создать новый и вернуть его.
-        :param kwargs: критерии поиска/создания
+        Попытаться найти вакансию по ее ключу (vacancy_key). Если не найдена, создать новую.
+        :param kwargs: поля вакансии
         :return: (объект, создан ли объект: True/False)
         """
-        object_ = self.get(**kwargs)
+        key = vacancy_key(kwargs)
+        object_ = self.get(vacancy_key=key)
         if object_:
             return object_, False
 
         cursor = self.connection.cursor()
 
         try:
-            kwargs.update(status='Новая')
+            kwargs.update(status='Новая', content_hash=content_hash(kwargs), vacancy_key=key)
             columns = ", ".join(kwargs.keys())
             placeholders = ", ".join(["?"] * len(kwargs))
             values = tuple(kwargs.values())
 
             sql_insert = f"INSERT INTO jobs ({columns}) VALUES ({placeholders})"
             cursor.execute(sql_insert, values)
-            self.connection.commit()
+            self.db.commit()
 
             row_id = cursor.lastrowid
             sql_select = "SELECT * FROM jobs WHERE id = ?"
@@ -82,15 +146,25 @@ class JobManager:
             obj = dict(zip([desc[0] for desc in cursor.description], row), id=row_id)
             return obj, True
         except Exception as e:
-            self.connection.rollback()
+            self.db.rollback()
             logging.error(f"Ошибка в get_or_create: {e}")
             raise
         finally:
             cursor.close()
 
     def get(self, **kwargs) -> dict or None:
-        """Получить одну задачу по указанным фильтрам."""
-        cursor = self.connection.cursor()
+        """
+        Получить одну вакансию по указанным фильтрам.
+        Запрос только по id обслуживается из кэша записей.
+        """
+        by_id = list(kwargs) == ['id']
+        if by_id:
+            record = self.cache.get(int(kwargs['id']))
+            if record is not None:
+                return record
+            version = self.cache.version
+
+        cursor = self.db.read_connection().cursor()
 
         where_clause = " AND ".join([f"{key} = ?" for key in kwargs.keys()])
         values = tuple(kwargs.values())
@@ -106,7 +180,10 @@ class JobManager:
         result = cursor.fetchone()
         if result:
             column_names = [desc[0] for desc in cursor.description]
-            return dict(zip(column_names, result))
+            record = dict(zip(column_names, result))
+            if by_id:
+                self.cache.put(record['id'], record, version)
+            return record
         return None
 
     def all(self) -> List[Dict]:
@@ -114,45 +191,148 @@ class JobManager:
         Получить все записи.
         :return: Список всех задач.
         """
-        cursor = self.connection.cursor()
+        cursor = self.db.read_connection().cursor()
         cursor.execute("SELECT * FROM jobs")
         return [dict(row) for row in cursor.fetchall()]
 
+    def save_for_chat(self, chat_id: int, job_ids: List[int]) -> None:
+        """
+        Добавить вакансии в список чата. Уже добавленные не меняются.
+        :param chat_id: ID чата.
+        :param job_ids: ID вакансий.
+        """
+        cursor = self.connection.cursor()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO chat_jobs (chat_id, job_id) VALUES (?, ?)",
+            [(chat_id, job_id) for job_id in job_ids],
+        )
+        self.db.commit()
+
+    def set_status(self, chat_id: int, job_id: int, status: str) -> None:
+        """
+        Установить статус вакансии в списке чата (например, 'Просмотрен').
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            INSERT INTO chat_jobs (chat_id, job_id, status) VALUES (?, ?, ?)
+            ON CONFLICT (chat_id, job_id) DO UPDATE SET status = excluded.status
+            """,
+            (chat_id, job_id, status),
+        )
+        self.db.commit()
+
+    def page(self, chat_id: int, after_id: int = None, limit: int = 10, filters: Dict = None,
+             before_id: int = None) -> Tuple[List[Dict], bool]:
+        """
+        Получить страницу вакансий из списка чата, от новых к старым, по ключу id (keyset-пагинация).
+        Запрос читает только диапазон индекса chat_jobs этого чата.
+        :param chat_id: ID чата.
+        :param after_id: Вернуть вакансии, идущие после этой (id меньше after_id).
+        :param limit: Размер страницы.
+        :param filters: Фильтры по колонкам chat_jobs (например, {'status': 'Новая'}).
+        :param before_id: Вернуть вакансии, идущие перед этой (предыдущая страница).
+        :return: (вакансии страницы, есть ли еще вакансии в направлении листания).
+        """
+        conditions = ["chat_jobs.chat_id = ?"] + [f"chat_jobs.{key} = ?" for key in (filters or {})]
+        values = [chat_id] + list((filters or {}).values())
+        if before_id is not None:
+            conditions.append("chat_jobs.job_id > ?")
+            values.append(before_id)
+            order = "ASC"
+        else:
+            if after_id is not None:
+                conditions.append("chat_jobs.job_id < ?")
+                values.append(after_id)
+            order = "DESC"
+
+        cursor = self.db.read_connection().cursor()
+        cursor.execute(
+            f"""
+            SELECT jobs.id, jobs.title, jobs.company, jobs.link, jobs.salary, jobs.job_type, chat_jobs.status
+            FROM chat_jobs
+            JOIN jobs ON jobs.id = chat_jobs.job_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY chat_jobs.job_id {order}
+            LIMIT ?
+            """,
+            (*values, limit + 1),
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if before_id is not None:
+            rows.reverse()
+        return rows, has_more
+
+    def search(self, query: str, limit: int = 50, offset: int = 0, chat_id: int = None) -> List[Dict]:
+        """
+        Полнотекстовый поиск вакансий по названию, компании и типу работы.
+        Каждое слово запроса ищется по префиксу, результаты упорядочены по bm25.
+        :param query: Поисковая строка.
+        :param limit: Максимальное количество записей.
+        :param offset: Сколько записей пропустить.
+        :param chat_id: Если указан, статус вакансии берется из списка этого чата.
+        :return: Список вакансий, сначала самые релевантные.
+        """
+        words = re.findall(r"[\w+#]+", query.lower())
+        if not words:
+            return []
+        match = " ".join(f'"{word}"*' for word in words)
+
+        cursor = self.db.read_connection().cursor()
+        cursor.execute(
+            """
+            SELECT jobs.id, jobs.title, jobs.company, jobs.link, jobs.salary, jobs.job_type,
+                   ifnull(chat_jobs.status, jobs.status) AS status
+            FROM jobs_fts
+            JOIN jobs ON jobs.id = jobs_fts.rowid
+            LEFT JOIN chat_jobs ON chat_jobs.chat_id = ? AND chat_jobs.job_id = jobs.id
+            WHERE jobs_fts MATCH ?
+            ORDER BY bm25(jobs_fts, 10.0, 2.0, 1.0)
+            LIMIT ? OFFSET ?
+            """,
+            (chat_id, match, limit, offset),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
     def filter(self, **kwargs) -> List[Dict]:
         """
         Получить записи по фильтру.
         :param kwargs: Фильтры (например, func="my_function").
         :return: Список задач, соответствующих фильтрам.
         """
-        cursor = self.connection.cursor()
+        cursor = self.db.read_connection().cursor()
         where_clause = " AND ".join([f"{key} = ?" for key in kwargs.keys()])
         values = tuple(kwargs.values())
         query = f"SELECT * FROM jobs WHERE {where_clause}"
         cursor.execute(query, values)
         return [dict(row) for row in cursor.fetchall()]
 
-    def update(self, job_id: str, **kwargs):
+    def update(self, job_id: int, **kwargs):
         """
         Обновить запись по job_id.
-        :param job_id: ID задачи.
-        :param kwargs: Поля для обновления (например, next_run_time=datetime.now()).
+        :param job_id: ID вакансии.
+        :param kwargs: Поля для обновления (например, status='Просмотрен').
         """
         cursor = self.connection.cursor()
         set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
         values = tuple(kwargs.values()) + (job_id,)
-        query = f"UPDATE jobs SET {set_clause} WHERE job_id = ?"
+        query = f"UPDATE jobs SET {set_clause} WHERE id = ?"
         cursor.execute(query, values)
-        self.connection.commit()
+        self.db.commit()
+        self.invalidate(job_id)
 
-    def delete(self, job_id: str) -> bool:
+    def delete(self, job_id: int) -> bool:
         """
         Удалить запись по job_id.
-        :param job_id: ID задачи.
+        :param job_id: ID вакансии.
         :return: True, если запись была удалена, иначе False.
         """
         cursor = self.connection.cursor()
-        cursor.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
-        self.connection.commit()
+        cursor.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self.db.commit()
+        self.invalidate(job_id)
         return cursor.rowcount > 0
 
     def clear(self):
@@ -161,4 +341,17 @@ class JobManager:
         """
         cursor = self.connection.cursor()
         cursor.execute("DELETE FROM jobs")
-        self.connection.commit()
+        self.db.commit()
+        self.invalidate()
+
+    def invalidate(self, job_id: int = None) -> None:
+        """
+        Убирает вакансию (или весь кэш, если job_id не указан) сразу
+        и еще раз после коммита, чтобы читатель не вернул старую строку.
+        """
+        if job_id is None:
+            self.cache.clear()
+            self.db.on_commit(self.cache.clear)
+        else:
+            self.cache.invalidate(int(job_id))
+            self.db.on_commit(self.cache.invalidate, int(job_id))
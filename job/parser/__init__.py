@@ -0,0 +1,9 @@
+from typing import List
+
+from job.parser import dev, hh  # noqa: F401 — модули регистрируют свои парсеры
+from job.parser.base_parser import PARSERS, BaseParser, register_parser
+
+
+def get_parsers() -> List[BaseParser]:
+    """Создает по экземпляру каждого зарегистрированного парсера."""
+    return [parser_class() for parser_class in PARSERS.values()]
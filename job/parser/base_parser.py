@@ -1,8 +1,39 @@
+import asyncio
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from typing import AsyncIterator, Dict, Iterator, List, Type
+
+from core.settings import SOURCE_THREADS
+
+PARSERS: Dict[str, Type['BaseParser']] = {}
+
+# asyncio.wait_for не останавливает поток, поэтому зависшие по таймауту парсеры
+# занимают только этот пул, а не пул цикла событий по умолчанию
+parser_executor = ThreadPoolExecutor(max_workers=SOURCE_THREADS, thread_name_prefix='parser')
+
+
+async def run_in_parser_thread(function, *args):
+    """Выполняет синхронный вызов парсера в parser_executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(parser_executor, functools.partial(function, *args))
+
+
+def register_parser(cls: Type['BaseParser']) -> Type['BaseParser']:
+    """Декоратор: добавляет парсер в реестр источников вакансий."""
+    PARSERS[cls.name] = cls
+    return cls
 
 
 class BaseParser(ABC):
+    name = None
+    # Лента отсортирована от новых вакансий к старым,
+    # и обход можно остановить на первой полностью известной странице
+    incremental = False
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(name={self.name})>"
 
     @abstractmethod
     def get_response_text(self) -> str:
@@ -11,3 +42,25 @@ class BaseParser(ABC):
     @abstractmethod
     def search_vacancies(self, vacancy: str) -> List[Dict]:
         pass
+
+    def iter_feed(self) -> Iterator[List[Dict]]:
+        """Отдает всю ленту вакансий источника постранично."""
+        yield self.search_vacancies('')
+
+    async def asearch_vacancies(self, vacancy: str) -> List[Dict]:
+        """Асинхронный поиск. По умолчанию синхронный поиск выполняется в потоке parser_executor."""
+        return await run_in_parser_thread(self.search_vacancies, vacancy)
+
+    async def aiter_feed(self) -> AsyncIterator[List[Dict]]:
+        """Асинхронная лента. По умолчанию каждая страница загружается в потоке parser_executor."""
+        feed = self.iter_feed()
+        try:
+            while True:
+                vacancies = await run_in_parser_thread(next, feed, None)
+                if vacancies is None:
+                    return
+                yield vacancies
+        finally:
+            # После отмены генератор может еще выполняться в потоке
+            with suppress(ValueError):
+                feed.close()
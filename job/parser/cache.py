@@ -0,0 +1,169 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+
+from core.http_client import http_client
+from core.settings import HTTP_CACHE_DB, HTTP_CACHE_MAX_ENTRIES
+
+
+class HttpCache:
+    """
+    Кэш HTTP-ответов источников вакансий в отдельной базе Sqlite.
+
+    Тела ответов хранятся сжатыми, запись считается свежей ttl секунд.
+    Устаревшая запись перепроверяется через ETag/If-Modified-Since,
+    а при превышении max_entries удаляются давно не читавшиеся записи.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_DB, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = None
+        self.lock = threading.Lock()
+        # Запросы, которые сейчас выполняются, по ключу кэша
+        self.inflight: Dict[str, Future] = {}
+        self.inflight_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<HttpCache(path={self.path})>"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    key TEXT PRIMARY KEY,                 -- Хэш URL и параметров
+                    url TEXT NOT NULL,                    -- URL запроса
+                    body BLOB NOT NULL,                   -- Сжатое тело ответа
+                    etag TEXT,                            -- Заголовок ETag
+                    last_modified TEXT,                   -- Заголовок Last-Modified
+                    fetched_at REAL NOT NULL,             -- Когда ответ был получен или перепроверен
+                    accessed_at REAL NOT NULL             -- Когда запись читали последний раз
+                )
+                """
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS http_cache_accessed_at ON http_cache (accessed_at)"
+            )
+            self.connection.commit()
+        return self.connection
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+
+    def _load(self, key: str) -> Optional[sqlite3.Row]:
+        with self.lock:
+            connection = self._connect()
+            return connection.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _touch(self, key: str, fetched: bool = False) -> None:
+        now = time.time()
+        with self.lock:
+            connection = self._connect()
+            if fetched:
+                connection.execute(
+                    "UPDATE http_cache SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+                )
+            else:
+                connection.execute("UPDATE http_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            connection.commit()
+
+    def _store(self, key: str, url: str, response: requests.Response) -> None:
+        now = time.time()
+        body = zlib.compress(response.text.encode())
+        with self.lock:
+            connection = self._connect()
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO http_cache (key, url, body, etag, last_modified, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now),
+            )
+            excess = connection.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    """
+                    DELETE FROM http_cache
+                    WHERE key IN (SELECT key FROM http_cache ORDER BY accessed_at LIMIT ?)
+                    """,
+                    (excess,),
+                )
+            connection.commit()
+
+    def get(self, url: str, params: Optional[Dict] = None, ttl: int = 0, timeout: float = None,
+            validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Возвращает тело ответа на GET-запрос, по возможности из кэша.
+        Одинаковые запросы из разных потоков выполняются один раз: остальные
+        потоки ждут результата первого, разные запросы друг друга не ждут.
+        :param validate: Проверка тела нового ответа; если она бросает исключение,
+                         ответ не кэшируется, а исключение передается вызывающему.
+        """
+        key = self.make_key(url, params)
+
+        with self.inflight_lock:
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self.inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            text = self._fetch(key, url, params, ttl, timeout, validate)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(text)
+            return text
+        finally:
+            with self.inflight_lock:
+                del self.inflight[key]
+
+    def _fetch(self, key: str, url: str, params: Optional[Dict], ttl: int, timeout: Optional[float],
+               validate: Optional[Callable[[str], Any]]) -> str:
+        entry = self._load(key)
+        if entry and time.time() - entry[3] < ttl:
+            self._touch(key)
+            return zlib.decompress(entry[0]).decode()
+
+        headers = {}
+        if entry and entry[1]:
+            headers['If-None-Match'] = entry[1]
+        if entry and entry[2]:
+            headers['If-Modified-Since'] = entry[2]
+
+        response = http_client.get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry:
+            self._touch(key, fetched=True)
+            return zlib.decompress(entry[0]).decode()
+
+        response.raise_for_status()
+        if validate is not None:
+            validate(response.text)
+        self._store(key, url, response)
+        return response.text
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша."""
+        with self.lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM http_cache")
+            connection.commit()
+
+
+http_cache = HttpCache()
@@ -1,43 +1,103 @@
-import lxml
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+from typing import Dict, Iterator, List
+
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 
-from job.constants import DEV_KG_URL
-from job.parser.base_parser import BaseParser
+from core.settings import DEV_KG_CACHE_TTL, PARSER_MAX_WORKERS, PARSER_TIMEOUT
+from job.constants import DEV_KG_PAGES, DEV_KG_URL
+from job.parser.base_parser import BaseParser, register_parser
+from job.parser.cache import HttpCache, http_cache
 
 
+@register_parser
 class DevKG(BaseParser):
+    name = 'devkg'
+    incremental = True
+
+    def __init__(self, max_workers: int = PARSER_MAX_WORKERS, timeout: float = PARSER_TIMEOUT,
+                 cache: HttpCache = http_cache):
+        """
+        :param max_workers: Сколько страниц загружать одновременно.
+        :param timeout: Таймаут одного запроса в секундах.
+        :param cache: Кэш HTTP-ответов.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+
+    def get_page(self, page: int) -> str:
+        return self.cache.get(DEV_KG_URL + str(page), ttl=DEV_KG_CACHE_TTL, timeout=self.timeout)
+
+    def iter_pages(self) -> Iterator[str]:
+        """
+        Загружает страницы конкурентно и отдает их по мере получения.
+        Страница, которую не удалось загрузить, пропускается.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {executor.submit(self.get_page, page): page for page in range(1, DEV_KG_PAGES + 1)}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except requests.RequestException as e:
+                    logging.warning(f"DevKG: не удалось загрузить страницу {futures[future]}: {e}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def get_response_text(self):
-        text = ''
-        for page in range(1, 9):
-            response = requests.get(DEV_KG_URL+str(page))
-            text += response.text
+        return ''.join(self.iter_pages())
 
-        return text
+    def parse_page(self, text: str, vacancy: str) -> Iterator[Dict]:
+        """
+        Потоково разбирает страницу и отдает вакансии, в должности которых есть vacancy.
+        В памяти держится только текущий article.item, остальная разметка сразу очищается.
+        """
+        articles = etree.iterparse(BytesIO(text.encode()), events=('end',), tag='article',
+                                   html=True, recover=True, encoding='utf-8')
+        for _, article in articles:
+            if 'item' in (article.get('class') or '').split():
+                fields = self.extract_fields(article)
+                position = fields.get('position', '').replace('Должность', '').strip()
+                if vacancy in position.lower():
+                    yield {
+                        'title': position,
+                        'company': fields.get('company', '').replace('Компания', '').strip(),
+                        'link': "https://devkg.com" + fields.get('link', ''),
+                        'salary': fields.get('price', '').replace('Оклад', '').strip(),
+                        'job_type': fields.get('type', '').replace('Тип', '').strip(),
+                        'status': 'Новая'
+                    }
+
+            article.clear(keep_tail=True)
+            while article.getprevious() is not None:
+                del article.getparent()[0]
+
+    @staticmethod
+    def extract_fields(article) -> Dict[str, str]:
+        """Собирает поля вакансии за один проход по потомкам article.item."""
+        fields = {}
+        for element in article.iter('div', 'a'):
+            classes = (element.get('class') or '').split()
+            if element.tag == 'a' and 'link' in classes:
+                fields.setdefault('link', element.get('href') or '')
+            elif element.tag == 'div' and 'jobs-item-field' in classes:
+                for name in classes:
+                    if name != 'jobs-item-field':
+                        fields.setdefault(name, ''.join(element.itertext()))
+        return fields
+
+    def iter_feed(self) -> Iterator[List[Dict]]:
+        """Загружает страницы по порядку, начиная с самых новых вакансий."""
+        for page in range(1, DEV_KG_PAGES + 1):
+            yield list(self.parse_page(self.get_page(page), ''))
 
     def search_vacancies(self, vacancy: str):
         result = []
 
-        text = self.get_response_text()
-        soup = BeautifulSoup(text, 'lxml')
-        vacancies_html = soup.find_all(name='article', class_='item')
-        for vacancy_html in vacancies_html:
-            position = vacancy_html.find(name='div', class_='jobs-item-field position').text.replace('Должность',
-                                                                                                '').strip()
-            if vacancy in position.lower():
-                company = vacancy_html.find(name='div', class_='jobs-item-field company').text.replace('Компания',
-                                                                                              '').strip()
-                link = "https://devkg.com" + vacancy_html.find(name='a', class_='link').get('href')
-                salary = vacancy_html.find(name='div', class_='jobs-item-field price').text.replace('Оклад', '').strip()
-                job_type = vacancy_html.find(name='div', class_='jobs-item-field type').text.replace('Тип', '').strip()
-                result.append({
-                    'title': position,
-                    'company': company,
-                    'link': link,
-                    'salary': salary,
-                    'job_type': job_type,
-                    'status': 'Новая'
-                })
-
-        return result
\ No newline at end of file
+        for text in self.iter_pages():
+            result.extend(self.parse_page(text, vacancy))
+
+        return result
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from core.settings import (SOURCE_FAILURE_THRESHOLD, SOURCE_RESET_TIMEOUT,
+                           SOURCE_TIMEOUT)
+from job.parser.base_parser import BaseParser
+
+
+class CircuitBreaker:
+    """
+    Размыкается после failure_threshold ошибок подряд и не пропускает
+    запросы reset_timeout секунд, после чего пропускает одну пробную попытку;
+    остальные вызовы ждут ее результата разомкнутыми.
+    """
+
+    def __init__(self, failure_threshold: int = SOURCE_FAILURE_THRESHOLD,
+                 reset_timeout: float = SOURCE_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        # Когда ушла пробная попытка; None — пробы сейчас нет
+        self.probe_started_at = None
+
+    def __repr__(self):
+        return f"<CircuitBreaker(failures={self.failures}, open={self.opened_at is not None})>"
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        # Проба, не вернувшая результат за reset_timeout (например, отмененная), не блокирует следующую
+        if self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout:
+            return False
+        self.probe_started_at = now
+        return True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def failure(self) -> None:
+        # Неудачная проба оставляет failures не ниже порога и снова размыкает цепь
+        self.failures += 1
+        self.probe_started_at = None
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class SourceFanOut:
+    """
+    Опрашивает все источники вакансий одновременно.
+    У каждого источника свой дедлайн и свой CircuitBreaker;
+    медленный или сломанный источник не задерживает остальные.
+    """
+
+    def __init__(self, parsers: List[BaseParser], timeout: float = SOURCE_TIMEOUT):
+        self.parsers = parsers
+        self.timeout = timeout
+        self.breakers = {parser.name: CircuitBreaker() for parser in parsers}
+
+    def __repr__(self):
+        return f"<SourceFanOut(parsers={self.parsers}, timeout={self.timeout})>"
+
+    async def gather(self, call: Callable[[BaseParser], Awaitable[Any]]) -> Dict[str, Any]:
+        """
+        Выполняет call(parser) для всех доступных источников.
+        :return: Результаты источников, уложившихся в дедлайн, по имени источника.
+        """
+        parsers = [parser for parser in self.parsers if self.breakers[parser.name].allow()]
+        skipped = len(self.parsers) - len(parsers)
+        if skipped:
+            logging.warning(f"Пропущено источников с разомкнутой цепью: {skipped}")
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(call(parser), self.timeout) for parser in parsers), return_exceptions=True
+        )
+
+        completed = {}
+        for parser, result in zip(parsers, results):
+            breaker = self.breakers[parser.name]
+            if isinstance(result, asyncio.TimeoutError):
+                breaker.failure()
+                logging.warning(f"Источник {parser.name} не ответил за {self.timeout} с")
+            elif isinstance(result, Exception):
+                breaker.failure()
+                logging.error(f"Ошибка источника {parser.name}: {result}")
+            else:
+                breaker.success()
+                completed[parser.name] = result
+        return completed
+
+    async def search(self, vacancy: str) -> List[Dict]:
+        """Ищет вакансию во всех источниках и возвращает то, что успело прийти."""
+        results = await self.gather(lambda parser: parser.asearch_vacancies(vacancy))
+        return [vacancy for vacancies in results.values() for vacancy in vacancies]
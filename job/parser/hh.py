@@ -1,28 +1,73 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List
 
 import requests
 
-from job.constants import HEAD_HUNTER_URL, KYRGYZSTAN_AREA_CODE
-from job.parser.base_parser import BaseParser
+from core.settings import (HEAD_HUNTER_CACHE_TTL, PARSER_MAX_WORKERS,
+                           PARSER_TIMEOUT)
+from job.constants import (HEAD_HUNTER_MAX_DEPTH, HEAD_HUNTER_PER_PAGE,
+                           HEAD_HUNTER_URL, KYRGYZSTAN_AREA_CODE)
+from job.parser.base_parser import BaseParser, register_parser
+from job.parser.cache import HttpCache, http_cache
 
 
+@register_parser
 class HhParser(BaseParser):
+    name = 'hh'
+
+    def __init__(self, max_workers: int = PARSER_MAX_WORKERS, timeout: float = PARSER_TIMEOUT,
+                 cache: HttpCache = http_cache):
+        """
+        :param max_workers: Сколько страниц запрашивать одновременно.
+        :param timeout: Таймаут одного запроса в секундах.
+        :param cache: Кэш HTTP-ответов.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+
     def get_response_text(self) -> str:
         pass
 
+    def get_page(self, vacancy: str, page: int) -> Dict:
+        text = self.cache.get(HEAD_HUNTER_URL, params={
+            'text': vacancy,
+            'area': KYRGYZSTAN_AREA_CODE,
+            'per_page': HEAD_HUNTER_PER_PAGE,
+            'page': page
+        }, ttl=HEAD_HUNTER_CACHE_TTL, timeout=self.timeout, validate=json.loads)
+        return json.loads(text)
+
+    def get_vacancies(self, vacancy: str) -> List[Dict]:
+        """
+        Первая страница сообщает сколько всего страниц (pages),
+        остальные существующие страницы запрашиваются конкурентно.
+        """
+        first_page = self.get_page(vacancy, 0)
+        vacancies = list(first_page.get('items') or [])
+
+        # API отдает не больше HEAD_HUNTER_MAX_DEPTH результатов на запрос
+        pages = min(first_page.get('pages') or 0, HEAD_HUNTER_MAX_DEPTH // HEAD_HUNTER_PER_PAGE)
+        if pages <= 1:
+            return vacancies
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.get_page, vacancy, page): page for page in range(1, pages)}
+            for future in as_completed(futures):
+                try:
+                    vacancies.extend(future.result().get('items') or [])
+                except (requests.RequestException, ValueError) as e:
+                    # ValueError — страница пришла не JSON (json.JSONDecodeError)
+                    logging.warning(f"hh.ru: не удалось загрузить страницу {futures[future]}: {e}")
+
+        return vacancies
+
     def search_vacancies(self, vacancy: str) -> List[Dict]:
         result = []
-        vacancies = []
-        for i in range(1, 11):
-            page_vacancies_list = requests.get(url=HEAD_HUNTER_URL, params={
-                                                                'text': vacancy,
-                                                                'area':KYRGYZSTAN_AREA_CODE,
-                                                                'per_page':'10',
-                                                                'page': i
-                                                            }).json().get('items')
-            vacancies.extend(page_vacancies_list)
-
-        for vacancy in vacancies:
+
+        for vacancy in self.get_vacancies(vacancy):
             salary = vacancy.get('salary') or {}
             result.append({
                 'title': vacancy.get('name'),
@@ -1,17 +1,28 @@
+import datetime
+import functools
 import logging
 
+from apscheduler.triggers.interval import IntervalTrigger
 from telegram.ext import filters, CallbackQueryHandler
 from telegram.ext import Application, CommandHandler, ConversationHandler, MessageHandler
 
-from core.database import SqliteDB
-from core.settings import BOT_TOKEN
+from core.database import AsyncManager, SqliteDB
+from core.dispatcher import NotificationDispatcher
+from core.metrics import GaugeCallback, registry, start_metrics_server
+from core.settings import (BOT_TOKEN, CRAWL_INTERVAL, TELEGRAM_BASE_FILE_URL,
+                           TELEGRAM_BASE_URL, WEBHOOK_LISTEN,
+                           WEBHOOK_MAX_CONNECTIONS, WEBHOOK_PATH, WEBHOOK_PORT,
+                           WEBHOOK_SECRET_TOKEN, WEBHOOK_URL)
+from core.updates import ChatOrderedUpdateProcessor, instrument_handler
+from job.crawler import VacancyCrawler
 from job.handlers import vacancies_list_handler, vacancy_detail, vacancy_name, search_vacancies, SEARCH_VACANCY
 from job.manager import JobManager
 from task.handlers import start, scheduler, specific_date_task, TASK_DATE, task_for_date, add_task, task_name, \
     TASK_NAME, TASK_DESCRIPTION, choice_time, task_description, EXECUTION_TIME, HOURS_AND_MINUTES, execution_time, \
     hours_and_minutes, skip_time, tasks_list, today_tasks, week_tasks, month_tasks, all_tasks, task_info, task_done, \
-    delete_task, task_not_completed
+    delete_task, task_not_completed, send_reminder, date_tasks
 from task.manager import TaskManager
+from task.reminders import ReminderQueue
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
@@ -21,16 +32,66 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
-def main() -> None:
-    application = Application.builder().token(BOT_TOKEN).build()
+async def post_init(application: Application) -> None:
+    # AsyncIOScheduler привязывается к запущенному циклу событий, поэтому стартует здесь, а не в main()
+    scheduler.start()
+    application.bot_data['dispatcher'].start()
+    application.bot_data['reminders'].start()
+
+
+async def post_shutdown(application: Application) -> None:
+    await application.bot_data['reminders'].stop()
+    await application.bot_data['dispatcher'].stop()
+    scheduler.shutdown(wait=False)
+
+
+def register_metrics(task_manager: AsyncManager, job_manager: AsyncManager,
+                     dispatcher: NotificationDispatcher, reminders: ReminderQueue) -> None:
+    """Выгружает в /metrics статистику кэшей записей, очереди сообщений и напоминаний."""
+    caches = {'task': task_manager.manager.cache, 'job': job_manager.manager.cache}
+    registry.register(GaugeCallback(
+        'record_cache', 'Record cache statistics', ('manager', 'stat'),
+        lambda: {(name, stat): value for name, cache in caches.items() for stat, value in cache.stats().items()},
+    ))
+    registry.register(GaugeCallback(
+        'notification_dispatcher', 'Notification dispatcher statistics', ('stat',),
+        lambda: {(stat,): value for stat, value in dispatcher.stats().items()},
+    ))
+    registry.register(GaugeCallback(
+        'reminders_loaded', 'Reminders loaded into the in-memory heap', (),
+        lambda: {(): len(reminders.heap)},
+    ))
 
-    database = SqliteDB()
-    task_manager = TaskManager(database)
-    job_manager = JobManager(database)
 
-    application.bot_data.update(task=task_manager, job=job_manager)
+def main() -> None:
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .base_url(TELEGRAM_BASE_URL)
+        .base_file_url(TELEGRAM_BASE_FILE_URL)
+        .concurrent_updates(ChatOrderedUpdateProcessor())
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
-    scheduler.start()
+    database = SqliteDB()
+    task_manager = AsyncManager(TaskManager(database))
+    job_manager = AsyncManager(JobManager(database))
+    dispatcher = NotificationDispatcher(application.bot)
+    reminders = ReminderQueue(task_manager, functools.partial(send_reminder, dispatcher))
+
+    application.bot_data.update(task=task_manager, job=job_manager, reminders=reminders, dispatcher=dispatcher)
+    register_metrics(task_manager, job_manager, dispatcher, reminders)
+
+    crawler = VacancyCrawler(job_manager)
+    scheduler.add_job(
+        func=crawler.crawl,
+        trigger=IntervalTrigger(seconds=CRAWL_INTERVAL),
+        next_run_time=datetime.datetime.now(),
+        max_instances=1,
+        coalesce=True,
+    )
 
     task_conv_handler = ConversationHandler(
         entry_points=[CallbackQueryHandler(specific_date_task, 'specific_date')],
@@ -72,11 +133,13 @@ def main() -> None:
     application.add_handler(CallbackQueryHandler(week_tasks, 'week'))
     application.add_handler(CallbackQueryHandler(month_tasks, 'month'))
     application.add_handler(CallbackQueryHandler(all_tasks, 'all_time'))
+    application.add_handler(CallbackQueryHandler(date_tasks, r'date_\d{8}_'))
     application.add_handler(CallbackQueryHandler(task_info, 'task_'))
     application.add_handler(CallbackQueryHandler(task_done, 'done_'))
     application.add_handler(CallbackQueryHandler(delete_task, 'delete_'))
     application.add_handler(CallbackQueryHandler(task_not_completed, 'not_completed_'))
 
+    application.add_handler(MessageHandler(filters.Regex('Список вакансий'), callback=vacancies_list_handler))
     application.add_handler(CallbackQueryHandler(vacancies_list_handler, 'vacancies_list'))
     application.add_handler(CallbackQueryHandler(vacancy_detail, 'vacancy_'))
 
@@ -84,7 +147,22 @@ def main() -> None:
     application.add_handler(task_conv_handler)
     application.add_handler(job_conv_handler)
 
-    application.run_polling()
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            instrument_handler(handler)
+    start_metrics_server()
+
+    if WEBHOOK_URL:
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=WEBHOOK_URL,
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+        )
+    else:
+        application.run_polling()
 
 
 if __name__ == "__main__":
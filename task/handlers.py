@@ -1,18 +1,16 @@
 import datetime
-import json
 import re
 
-import requests
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.date import DateTrigger
-from telegram import Update
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.error import BadRequest
 from telegram.ext import ContextTypes, ConversationHandler
 from telegram_bot_calendar import LSTEP, DetailedTelegramCalendar
 
-from core.settings import BOT_TOKEN
+from core.settings import TASKS_PAGE_SIZE
 from task.keyboard import (start_keyboard, task_keyboard, tasks_keyboard,
                            tasks_list_datetime)
+from task.manager import parse_page_cursor
 
 scheduler = AsyncIOScheduler()
 
@@ -21,22 +19,18 @@ TASK_NAME, TASK_DESCRIPTION, EXECUTION_TIME, HOURS_AND_MINUTES = range(4)
 TASK_DATE = 0
 
 
-def notification(task, chat_id, token):
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    keyboard = {
-        "inline_keyboard": [
-            [
-                {"text": "Готово!", "callback_data": f"done_{task.get('id')}"},
-            ]
-        ]
-    }
-    data = {
-        "chat_id": chat_id,
-        "text": f"Напоминание!\n Пора выполнить задачу:\n\n{task['title']}\nОписание: {task['description']}",
-        "reply_markup": json.dumps(keyboard)
+async def send_reminder(dispatcher, task: dict) -> None:
+    """
+    Ставит напоминание по задаче в очередь NotificationDispatcher.
+    Не ждет отправки, чтобы всплеск напоминаний не тормозил ReminderQueue.
+    """
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("Готово!", callback_data=f"done_{task.get('id')}")]])
+    await dispatcher.send_message(
+        task['chat_id'],
+        f"Напоминание!\n Пора выполнить задачу:\n\n{task['title']}\nОписание: {task['description']}",
+        reply_markup=keyboard,
+    )
 
-    }
-    response = requests.post(url, data)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     keyboard = await start_keyboard()
@@ -135,20 +129,16 @@ async def hours_and_minutes(update: Update, context: ContextTypes.DEFAULT_TYPE)
     task = context.bot_data.get('task')
     user_data = context.user_data
 
-    task = task.create(
+    remind_at = execution_datetime if execution_datetime > datetime.datetime.now() else None
+    task = await task.create(
+        update.effective_chat.id,
         user_data.get('task_title'),
         user_data.get('description', 'Описания - нет!'),
         execution_datetime,
         'В процессе',
+        remind_at,
     )
-
-    if user_data.get('execution_time') > datetime.datetime.now():
-        scheduler.add_job(
-            func=notification,
-            trigger=DateTrigger(user_data.get('execution_time')),
-            args=[task, update.message.chat_id, context.bot_data.get('token')]
-        )
-        scheduler.id = task.get('id')
+    context.bot_data['reminders'].add(task)
     await update.message.reply_text('Задачка успешно сохранена')
     user_data.clear()
     return ConversationHandler.END
@@ -158,19 +148,17 @@ async def skip_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     user_data = context.user_data
     task = context.bot_data.get('task')
 
-    task = task.create(
+    execution_date = user_data.get('execution_time')
+    remind_at = execution_date if execution_date >= datetime.date.today() else None
+    task = await task.create(
+        update.effective_chat.id,
         user_data.get('task_title'),
         user_data.get('description', 'Описания - нет!'),
-        user_data.get('execution_time'),
+        execution_date,
         'В процессе',
+        remind_at,
     )
-    if user_data.get('execution_time') >= datetime.date.today():
-        scheduler.add_job(
-            func=notification,
-            trigger=DateTrigger(user_data.get('execution_time')),
-            args=[task, update.message.chat_id, context.bot_data.get('token')]
-        )
-        scheduler.id = task.get('id')
+    context.bot_data['reminders'].add(task)
     await update.message.reply_text('Задачка успешно сохранена')
     user_data.clear()
     return ConversationHandler.END
@@ -178,10 +166,10 @@ async def skip_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 
 async def tasks_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     task = context.bot_data.get('task')
-    tasks = task.all()
+    has_tasks = await task.exists(update.effective_chat.id)
 
     if update.message is None:
-        if not tasks:
+        if not has_tasks:
             await update.callback_query.edit_message_text('У вас пока нет задач.')
             return
         await update.callback_query.edit_message_text(
@@ -189,7 +177,7 @@ async def tasks_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         reply_markup=tasks_list_datetime()
     )
     else:
-        if not tasks:
+        if not has_tasks:
             await update.message.reply_text('У вас пока нет задач.')
             return
         await update.message.reply_text(
@@ -198,22 +186,45 @@ async def tasks_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         )
 
 
+async def tasks_page(update: Update, context: ContextTypes.DEFAULT_TYPE, view: str, text: str,
+                     start_date: datetime.date = None, end_date: datetime.date = None) -> None:
+    """
+    Показывает страницу задач за период. view — префикс callback_data кнопок
+    периода, к нему добавляются _after_<ключ>/_before_<ключ> для листания (см. page_cursor).
+    """
+    task = context.bot_data.get('task')
+    chat_id = update.effective_chat.id
+    data = update.callback_query.data
+
+    if data.startswith(f'{view}_after_'):
+        after = parse_page_cursor(data[len(f'{view}_after_'):])
+        tasks, has_next = await task.page(chat_id, start_date, end_date, after=after, limit=TASKS_PAGE_SIZE)
+        has_previous = True
+    elif data.startswith(f'{view}_before_'):
+        before = parse_page_cursor(data[len(f'{view}_before_'):])
+        tasks, has_previous = await task.page(chat_id, start_date, end_date, before=before, limit=TASKS_PAGE_SIZE)
+        has_next = True
+    else:
+        tasks, has_next = await task.page(chat_id, start_date, end_date, limit=TASKS_PAGE_SIZE)
+        has_previous = False
+
+    await update.callback_query.edit_message_text(
+        text,
+        reply_markup=tasks_keyboard(tasks, 'tasks_list', view, has_previous, has_next),
+    )
+
+
 async def today_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE):
     today = datetime.datetime.today().date()
     tomorrow = today + datetime.timedelta(days=1)
 
-    task = context.bot_data.get('task')
-    tasks = task.get_tasks_for_range(today, tomorrow)
-    await update.callback_query.edit_message_text(
-        "Задачки на сегодня",
-        reply_markup=tasks_keyboard(tasks, 'tasks_list'),
-    )
+    await tasks_page(update, context, 'today', "Задачки на сегодня", today, tomorrow)
 
 
 async def task_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     task = context.bot_data.get('task')
     id = update.callback_query.data.split('_')[-1]
-    task_instance = task.get(id=id)
+    task_instance = await task.get(update.effective_chat.id, id=id)
     mark = ' ✅' if task_instance.get('status') == 'Выполнен' else ' ❌'
     text = (
         f"*Название:* {task_instance.get('title')}\n\n"
@@ -232,8 +243,8 @@ async def task_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def task_done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     task = context.bot_data.get('task')
     id = update.callback_query.data.split('_')[-1]
-    task.update(id=id, status="Выполнен")
-    task_instance = task.get(id=id)
+    await task.update(update.effective_chat.id, id, status="Выполнен")
+    task_instance = await task.get(update.effective_chat.id, id=id)
     mark = ' ✅' if task_instance.get('status') == 'Выполнен' else ' ❌'
     text = (
         f"*Название:* {task_instance.get('title')}\n\n"
@@ -254,8 +265,8 @@ async def task_done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def task_not_completed(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     task = context.bot_data.get('task')
     id = update.callback_query.data.split('_')[-1]
-    task.update(id=id, status="Не Выполнен")
-    task_instance = task.get(id=id)
+    await task.update(update.effective_chat.id, id, status="Не Выполнен")
+    task_instance = await task.get(update.effective_chat.id, id=id)
     mark = ' ✅' if task_instance.get('status') == 'Выполнен' else ' ❌'
     text = (
         f"*Название:* {task_instance.get('title')}\n\n"
@@ -276,7 +287,7 @@ async def task_not_completed(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def delete_task(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     task = context.bot_data.get('task')
     id = update.callback_query.data.split('_')[-1]
-    task.delete(id=id)
+    await task.delete(update.effective_chat.id, id)
     await update.callback_query.message.reply_text("Задача удалена")
     await tasks_list(update, context)
 
@@ -285,40 +296,36 @@ async def week_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     today = datetime.datetime.now().date()
 
     start_of_week = today - datetime.timedelta(days=today.weekday())
-    end_of_week = start_of_week + datetime.timedelta(days=6)
+    end_of_week = start_of_week + datetime.timedelta(days=7)
 
-    task = context.bot_data.get('task')
-    tasks = task.get_tasks_for_range(start_of_week, end_of_week)
-    await update.callback_query.edit_message_text(
-        "Задачки за эту неделю",
-        reply_markup=tasks_keyboard(tasks, 'tasks_list'),
-    )
+    await tasks_page(update, context, 'week', "Задачки за эту неделю", start_of_week, end_of_week)
 
 
 async def all_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    task = context.bot_data.get('task')
-    tasks = task.all()
-    await update.callback_query.edit_message_text(
-        "Задачки за эту неделю",
-        reply_markup=tasks_keyboard(tasks, 'tasks_list'),
-    )
+    await tasks_page(update, context, 'all_time', "Все задачки")
 
 
 async def month_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    task = context.bot_data.get('task')
     today = datetime.datetime.now().date()
 
     start_of_month = today.replace(day=1)
 
-    next_month = start_of_month.replace(month=start_of_month.month % 12 + 1, day=1)
-    end_of_month = next_month - datetime.timedelta(days=1)
+    next_month = (start_of_month + datetime.timedelta(days=32)).replace(day=1)
 
-    tasks = task.get_tasks_for_range(start_of_month, end_of_month)
+    await tasks_page(update, context, 'month', "Задачки за этот месяц", start_of_month, next_month)
 
-    await update.callback_query.edit_message_text(
-        "Задачки за этот месяц",
-        reply_markup=tasks_keyboard(tasks, 'tasks_list'),
-    )
+
+def date_view(date: datetime.date) -> str:
+    """Префикс callback_data для листания задач за конкретную дату: date_YYYYMMDD."""
+    return f"date_{date:%Y%m%d}"
+
+
+async def date_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    view = '_'.join(update.callback_query.data.split('_')[:2])
+    specific_date = datetime.datetime.strptime(view, "date_%Y%m%d").date()
+    next_day = specific_date + datetime.timedelta(days=1)
+
+    await tasks_page(update, context, view, f"Задачки за {specific_date}:", specific_date, next_day)
 
 
 async def specific_date_task(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -335,11 +342,12 @@ async def task_for_date(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
         specific_date = datetime.datetime.strptime(user_input, "%d:%m:%Y").date()
 
         task = context.bot_data.get('task')
-        tasks = task.get(date=specific_date)
+        next_day = specific_date + datetime.timedelta(days=1)
+        tasks, has_next = await task.page(update.effective_chat.id, specific_date, next_day, limit=TASKS_PAGE_SIZE)
         if tasks:
             await update.message.reply_text(
                 f"Задачки за {specific_date}:",
-                reply_markup=tasks_keyboard(tasks, 'tasks_list'),
+                reply_markup=tasks_keyboard(tasks, 'tasks_list', date_view(specific_date), False, has_next),
             )
             return ConversationHandler.END
         else:
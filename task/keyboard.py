@@ -1,6 +1,8 @@
 from telegram import (InlineKeyboardButton, InlineKeyboardMarkup,
                       KeyboardButton, ReplyKeyboardMarkup)
 
+from task.manager import page_cursor
+
 
 async def start_keyboard():
     reply_keyboard = [['Добавить задачу'], ['Посмотреть список задач'], ['Поиск вакансий'], ['Список вакансий']]
@@ -19,12 +21,21 @@ def tasks_list_datetime():
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def tasks_keyboard(tasks, back):
+def tasks_keyboard(tasks, back, view=None, has_previous=False, has_next=False):
     keyboard = []
     for task in tasks:
         mark = ' ✅' if task.get('status') == 'Выполнен' else ' ❌'
         text = f"{task.get('title')} - {task.get('date')} {mark}"
         keyboard.append([InlineKeyboardButton(text, callback_data=f'task_{task.get("id")}')])
+
+    navigation = []
+    if view and has_previous and tasks:
+        navigation.append(InlineKeyboardButton('⬅️', callback_data=f"{view}_before_{page_cursor(tasks[0])}"))
+    if view and has_next and tasks:
+        navigation.append(InlineKeyboardButton('➡️', callback_data=f"{view}_after_{page_cursor(tasks[-1])}"))
+    if navigation:
+        keyboard.append(navigation)
+
     keyboard.append([InlineKeyboardButton('Назад 🔙', callback_data=back)])
     return InlineKeyboardMarkup(keyboard)
 
@@ -1,42 +1,96 @@
 import datetime
 import sqlite3
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from core.cache import RecordCache
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+CURSOR_DATETIME_FORMAT = '%Y%m%d%H%M%S'
+
+
+def to_db_datetime(value: datetime.date or None) -> str or None:
+    """
+    Приводит дату или дату со временем к единому виду 'YYYY-MM-DD HH:MM:SS'.
+    Строки в этом формате сортируются и сравниваются как даты,
+    поэтому диапазонные запросы идут по индексу.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return value.strftime(DATETIME_FORMAT)
+
+
+def page_cursor(task: Dict) -> str:
+    """
+    Ключ листания (date, id) задачи для callback_data: '<YYYYMMDDHHMMSS>_<id>'.
+    Ключ несет саму дату, поэтому листание не зависит от того, существует ли еще задача.
+    """
+    date = datetime.datetime.strptime(task['date'], DATETIME_FORMAT)
+    return f"{date.strftime(CURSOR_DATETIME_FORMAT)}_{task['id']}"
+
+
+def parse_page_cursor(cursor: str) -> Tuple[str, int]:
+    """Обратное к page_cursor: (date в формате базы, id)."""
+    date, id = cursor.split('_')
+    return to_db_datetime(datetime.datetime.strptime(date, CURSOR_DATETIME_FORMAT)), int(id)
 
 
 class TaskManager:
+    # Методы только для чтения: AsyncManager выполняет их в пуле читателей
+    read_methods = ('get', 'all', 'exists', 'filter', 'get_tasks_for_range', 'page', 'next_reminders')
+
     def __init__(self, db):
+        """
+        Менеджер для работы с таблицей tasks.
+        Все запросы ограничены задачами одного чата (chat_id).
+        :param db: База данных (Sqlite).
+        """
         self.db = db
         self.connection = db.connection
         self.connection.row_factory = sqlite3.Row
+        self.cache = RecordCache()
 
-    def create(self, title: str, description: str, execution_time: datetime.datetime, status: str) -> dict:
+    def create(self, chat_id: int, title: str, description: str, execution_time: datetime.datetime,
+               status: str, remind_at: datetime.datetime = None) -> dict:
         """
         Создать задачу в базе данных.
+        :param remind_at: Когда отправить напоминание (None — без напоминания).
         """
         cursor = self.connection.cursor()
         cursor.execute(
             """
-            INSERT INTO tasks (title, description, date, status)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO tasks (chat_id, title, description, date, status, remind_at)
+            VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (title, description, execution_time, status),
+            (chat_id, title, description, to_db_datetime(execution_time), status, to_db_datetime(remind_at)),
         )
-        self.connection.commit()
+        self.db.commit()
         return {
             "id": cursor.lastrowid,
+            "chat_id": chat_id,
             "title": title,
             "description": description,
             "date": execution_time,
             "status": status,
+            "remind_at": to_db_datetime(remind_at),
         }
 
-    def get(self, **kwargs) -> dict or None:
+    def get(self, chat_id: int, **kwargs) -> dict or None:
         """
-        Получить одну задачу по указанным фильтрам.
+        Получить одну задачу чата по указанным фильтрам.
+        Запрос только по id обслуживается из кэша записей.
         """
-        cursor = self.connection.cursor()
-        where_clause = " AND ".join([f"{key} = ?" for key in kwargs.keys()])
-        values = tuple(kwargs.values())
+        by_id = list(kwargs) == ['id']
+        if by_id:
+            record = self.cache.get(int(kwargs['id']))
+            if record is not None:
+                return record if record.get('chat_id') == chat_id else None
+            version = self.cache.version
+
+        cursor = self.db.read_connection().cursor()
+        where_clause = " AND ".join(["chat_id = ?"] + [f"{key} = ?" for key in kwargs.keys()])
+        values = (chat_id,) + tuple(kwargs.values())
 
         query = f"""
             SELECT *
@@ -48,80 +102,195 @@ class TaskManager:
 
         cursor.execute(query, values)
         result = cursor.fetchone()
+        if result and by_id:
+            self.cache.put(result['id'], dict(result), version)
         return dict(result) if result else None
 
-    def all(self) -> List[Dict]:
+    def all(self, chat_id: int) -> List[Dict]:
         """
-        Получить все задачи.
+        Получить все задачи чата.
         """
-        self.connection.row_factory = sqlite3.Row
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT * FROM tasks ORDER BY date")
+        cursor = self.db.read_connection().cursor()
+        cursor.execute("SELECT * FROM tasks WHERE chat_id = ? ORDER BY date, id", (chat_id,))
         return [dict(row) for row in cursor.fetchall()]
 
-    def filter(self, **kwargs) -> List[Dict]:
+    def exists(self, chat_id: int) -> bool:
         """
-        Получить задачи по указанным фильтрам.
+        Есть ли у чата хотя бы одна задача.
         """
-        cursor = self.connection.cursor()
+        cursor = self.db.read_connection().cursor()
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM tasks WHERE chat_id = ? LIMIT 1)", (chat_id,))
+        return bool(cursor.fetchone()[0])
 
-        where_clause = " AND ".join([f"{key} = ?" for key in kwargs.keys()])
-        values = tuple(kwargs.values())
+    def filter(self, chat_id: int, **kwargs) -> List[Dict]:
+        """
+        Получить задачи чата по указанным фильтрам.
+        """
+        cursor = self.db.read_connection().cursor()
+
+        where_clause = " AND ".join(["chat_id = ?"] + [f"{key} = ?" for key in kwargs.keys()])
+        values = (chat_id,) + tuple(kwargs.values())
 
         query = f"""
             SELECT *
             FROM tasks
             WHERE {where_clause}
-            ORDER BY date
+            ORDER BY date, id
         """
 
         cursor.execute(query, values)
         return [dict(row) for row in cursor.fetchall()]
 
-    def update(self, id: int, **kwargs) -> None:
+    def update(self, chat_id: int, id: int, **kwargs) -> None:
         """
-        Обновить задачу по ID.
+        Обновить задачу чата по ID.
         """
         cursor = self.connection.cursor()
 
         set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
-        values = tuple(kwargs.values()) + (id,)
+        values = tuple(kwargs.values()) + (id, chat_id)
 
         query = f"""
             UPDATE tasks
             SET {set_clause}
-            WHERE id = ?
+            WHERE id = ? AND chat_id = ?
         """
 
         cursor.execute(query, values)
-        self.connection.commit()
+        self.db.commit()
+        self.invalidate(id)
 
-    def delete(self, id: int) -> None:
+    def delete(self, chat_id: int, id: int) -> None:
         """
-        Удалить задачу по ID.
+        Удалить задачу чата по ID.
         """
         cursor = self.connection.cursor()
         cursor.execute(
             """
             DELETE FROM tasks
-            WHERE id = ?
+            WHERE id = ? AND chat_id = ?
             """,
-            (id,),
+            (id, chat_id),
         )
-        self.connection.commit()
+        self.db.commit()
+        self.invalidate(id)
 
-    def get_tasks_for_range(self, start_date: datetime.date, end_date: datetime.date) -> List[Dict]:
+    def invalidate(self, id: int) -> None:
         """
-        Получить задачи в указанном диапазоне дат.
+        Убирает задачу из кэша сразу и еще раз после коммита,
+        чтобы читатель не успел вернуть в кэш старую версию строки.
+        """
+        self.cache.invalidate(int(id))
+        self.db.on_commit(self.cache.invalidate, int(id))
+
+    def next_reminders(self, after: Tuple[str, int] = None, limit: int = 1000) -> List[Tuple[str, int]]:
+        """
+        Следующие ожидающие напоминания в порядке (remind_at, id), по индексу tasks_remind_at.
+        :param after: Ключ (remind_at, id) последнего уже загруженного напоминания.
+        :return: Список ключей (remind_at, id).
+        """
+        cursor = self.db.read_connection().cursor()
+        if after is None:
+            cursor.execute(
+                """
+                SELECT remind_at, id FROM tasks
+                WHERE remind_at IS NOT NULL
+                ORDER BY remind_at, id
+                LIMIT ?
+                """,
+                (limit,),
+            )
+        else:
+            cursor.execute(
+                """
+                SELECT remind_at, id FROM tasks
+                WHERE remind_at IS NOT NULL AND (remind_at, id) > (?, ?)
+                ORDER BY remind_at, id
+                LIMIT ?
+                """,
+                (*after, limit),
+            )
+        return [tuple(row) for row in cursor.fetchall()]
+
+    def claim_reminder(self, id: int, remind_at: str) -> dict or None:
+        """
+        Атомарно снимает напоминание с задачи, если оно еще стоит на remind_at.
+        Повторная или устаревшая попытка (задача удалена, напоминание перенесено) вернет None.
+        :return: Задача, по которой нужно отправить напоминание.
         """
         cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE tasks SET remind_at = NULL
+            WHERE id = ? AND remind_at = ?
+            RETURNING *
+            """,
+            (id, remind_at),
+        )
+        rows = cursor.fetchall()
+        self.db.commit()
+        if not rows:
+            return None
+        self.invalidate(id)
+        return dict(rows[0])
+
+    def get_tasks_for_range(self, chat_id: int, start_date: datetime.date, end_date: datetime.date) -> List[Dict]:
+        """
+        Получить задачи чата в диапазоне дат [start_date, end_date).
+        """
+        cursor = self.db.read_connection().cursor()
         cursor.execute(
             """
             SELECT *
             FROM tasks
-            WHERE date BETWEEN ? AND ?
-            ORDER BY date
+            WHERE chat_id = ? AND date >= ? AND date < ?
+            ORDER BY date, id
             """,
-            (start_date, end_date),
+            (chat_id, to_db_datetime(start_date), to_db_datetime(end_date)),
         )
         return [dict(row) for row in cursor.fetchall()]
+
+    def page(self, chat_id: int, start_date: datetime.date = None, end_date: datetime.date = None,
+             after: Tuple[str, int] = None, before: Tuple[str, int] = None,
+             limit: int = 10) -> Tuple[List[Dict], bool]:
+        """
+        Получить страницу задач чата в диапазоне дат [start_date, end_date) (без границ — за все время),
+        упорядоченных по (date, id). Листание идет по ключу (date, id) задачи,
+        на которой закончилась или началась страница, поэтому запрос
+        читает из индекса (chat_id, date, id) только одну страницу.
+        :param after: Ключ (date, id), после которого начинается страница.
+        :param before: Ключ (date, id), перед которым заканчивается страница (предыдущая страница).
+        :return: (задачи страницы, есть ли еще задачи в направлении листания).
+        """
+        conditions = ["chat_id = ?"]
+        values = [chat_id]
+        if start_date is not None and end_date is not None:
+            conditions.append("date >= ? AND date < ?")
+            values.extend((to_db_datetime(start_date), to_db_datetime(end_date)))
+        if before is not None:
+            conditions.append("(date, id) < (?, ?)")
+            values.extend(before)
+            order = "DESC"
+        else:
+            if after is not None:
+                conditions.append("(date, id) > (?, ?)")
+                values.extend(after)
+            order = "ASC"
+
+        cursor = self.db.read_connection().cursor()
+        cursor.execute(
+            f"""
+            SELECT *
+            FROM tasks
+            WHERE {' AND '.join(conditions)}
+            ORDER BY date {order}, id {order}
+            LIMIT ?
+            """,
+            (*values, limit + 1),
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if before is not None:
+            rows.reverse()
+        return rows, has_more
@@ -0,0 +1,114 @@
+import asyncio
+import datetime
+import heapq
+import logging
+from typing import Callable, List, Tuple
+
+from core.settings import REMINDER_BATCH, REMINDER_POLL_INTERVAL
+from task.manager import to_db_datetime
+
+
+class ReminderQueue:
+    """
+    Очередь напоминаний на колонке tasks.remind_at.
+
+    В памяти держится только куча из ближайших напоминаний (не больше пачки),
+    остальные дочитываются из базы по ключу (remind_at, id), когда куча пустеет.
+    Напоминание снимается в базе атомарно (claim_reminder) перед отправкой,
+    поэтому после перезапуска ничего не теряется и не отправляется дважды.
+    """
+
+    def __init__(self, task, send: Callable, batch_size: int = REMINDER_BATCH,
+                 poll_interval: float = REMINDER_POLL_INTERVAL):
+        """
+        :param task: Асинхронный менеджер задач (AsyncManager(TaskManager)).
+        :param send: Корутина send(task), отправляющая напоминание по задаче.
+        :param batch_size: Сколько напоминаний дочитывать из базы за раз.
+        :param poll_interval: Максимальная пауза между проверками базы.
+        """
+        self.task = task
+        self.send = send
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.heap: List[Tuple[str, int]] = []
+        self.cursor: Tuple[str, int] = None
+        self.exhausted = False
+        self.wakeup = asyncio.Event()
+        self.runner: asyncio.Task = None
+
+    def __repr__(self):
+        return f"<ReminderQueue(pending={len(self.heap)}, exhausted={self.exhausted})>"
+
+    async def refill(self) -> None:
+        """Дочитывает следующую пачку напоминаний после уже загруженных."""
+        keys = await self.task.next_reminders(self.cursor, self.batch_size)
+        for key in keys:
+            heapq.heappush(self.heap, key)
+        if keys:
+            self.cursor = keys[-1]
+        self.exhausted = len(keys) < self.batch_size
+
+    def add(self, task: dict) -> None:
+        """
+        Сообщает очереди о новом напоминании. Если оно попадает в уже
+        загруженный диапазон, кладем его в кучу; иначе его прочитает refill.
+        """
+        remind_at = task.get('remind_at')
+        if remind_at is None:
+            return
+        key = (remind_at, task['id'])
+        if self.exhausted or (self.cursor is not None and key <= self.cursor):
+            heapq.heappush(self.heap, key)
+            if self.heap[0] == key:
+                self.wakeup.set()
+
+    async def fire(self, key: Tuple[str, int]) -> None:
+        remind_at, id = key
+        task = await self.task.claim_reminder(id, remind_at)
+        if task is None or task.get('chat_id') is None or task.get('status') == 'Выполнен':
+            return
+        try:
+            await self.send(task)
+        except Exception as e:
+            logging.error(f"Не удалось отправить напоминание по задаче {id}: {e}")
+
+    async def run(self) -> None:
+        # Стартовое состояние — один запрос по диапазону индекса tasks_remind_at
+        await self.refill()
+        while True:
+            if not self.heap and not self.exhausted:
+                await self.refill()
+                continue
+
+            now = to_db_datetime(datetime.datetime.now())
+            while self.heap and self.heap[0][0] <= now:
+                await self.fire(heapq.heappop(self.heap))
+
+            if self.heap:
+                due = datetime.datetime.fromisoformat(self.heap[0][0])
+                delay = min((due - datetime.datetime.now()).total_seconds(), self.poll_interval)
+            else:
+                delay = self.poll_interval
+
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+            if not self.heap and self.exhausted:
+                # Напоминания могли добавить в обход add (другой процесс, ручная правка базы)
+                await self.refill()
+
+    def start(self) -> None:
+        if self.runner is None:
+            self.runner = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            self.runner.cancel()
+            try:
+                await self.runner
+            except asyncio.CancelledError:
+                pass
+            self.runner = None